@@ -23,3 +23,38 @@ NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
 NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+
+# Extração de despesas
+EXTRACTION_MAX_CONCURRENCY = int(os.getenv("EXTRACTION_MAX_CONCURRENCY", 20))
+EXTRACTION_LIMIT_PER_HOST = int(os.getenv("EXTRACTION_LIMIT_PER_HOST", 10))
+
+# Cliente HTTP (API da Câmara)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 30))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 5))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", 0.5))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", 60))
+
+# Carga no Neo4j
+NEO4J_BATCH_SIZE = int(os.getenv("NEO4J_BATCH_SIZE", 5000))
+NEO4J_WRITE_WORKERS = int(os.getenv("NEO4J_WRITE_WORKERS", 4))
+
+# Cache de consultas Cypher
+CYPHER_CACHE_SIZE = int(os.getenv("CYPHER_CACHE_SIZE", 128))
+CYPHER_CACHE_TTL = float(os.getenv("CYPHER_CACHE_TTL", 600))
+CYPHER_VERSION_TTL = float(os.getenv("CYPHER_VERSION_TTL", 30))
+
+# Resultados paginados do console Cypher
+NEO4J_FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", 1000))
+CYPHER_PAGE_ROWS = int(os.getenv("CYPHER_PAGE_ROWS", 5000))
+CYPHER_PAGE_BYTES = int(os.getenv("CYPHER_PAGE_BYTES", 64 * 1024 * 1024))
+
+# Visualização de grafos (pyvis)
+GRAPH_NODE_BUDGET = int(os.getenv("GRAPH_NODE_BUDGET", 300))
+GRAPH_PHYSICS_MAX_NODES = int(os.getenv("GRAPH_PHYSICS_MAX_NODES", 150))
+
+# Layout das imagens de grafos (matplotlib)
+LAYOUT_CACHE_DIR = PROCESSED_DATA / 'layout_cache'
+PLOT_EDGE_LABEL_MAX_EDGES = int(os.getenv("PLOT_EDGE_LABEL_MAX_EDGES", 60))
+
+# Métricas do grafo calculadas em memória (cache por snapshot)
+ANALYTICS_CACHE_DIR = PROCESSED_DATA / 'analytics_cache'
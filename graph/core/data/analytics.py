@@ -0,0 +1,408 @@
+import os
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from rdflib import RDF
+from graph.config import PROCESSED_DATA, ID_LEGISLATURA, ANALYTICS_CACHE_DIR
+from graph.core.data.rdf.rdf_utils import SCHEMA, POL, load_rdf_graph
+from graph.core.data.rdf.triple_store import TripleStore
+from graph.core.data.rdf.graph_index import GraphIndex
+
+
+# Altere quando o cálculo das métricas mudar, para que os caches em Parquet sejam refeitos
+ANALYTICS_VERSION = 2
+
+# Agrupamentos dos deputados: nome da coluna -> predicado que liga o deputado ao grupo
+GROUPS = {
+    "partido": SCHEMA.memberOf,
+    "uf": SCHEMA.addressRegion,
+}
+
+# Agregações de despesas: nome -> colunas do agrupamento
+EXPENSE_GROUPS = {
+    "partido": ["partido"],
+    "uf": ["uf"],
+    "fornecedor": ["cnpj_cpf", "fornecedor"],
+    "mes": ["ano", "mes"],
+}
+
+
+def open_fingerprint(name, processed_dir=PROCESSED_DATA):
+    """
+    Caminho do grafo processado `<name>` (.hdt ou .nt) e a impressão digital do snapshot, sem abri-lo.
+    Retorna (None, None) se nenhum dos dois existir.
+    """
+    store_dir = os.path.join(processed_dir, f"{name}.hdt")
+    if os.path.exists(store_dir):
+        with open(os.path.join(store_dir, "meta.json"), "rb") as f:
+            return store_dir, hashlib.sha1(f.read()).hexdigest()
+    nt_path = os.path.join(processed_dir, f"{name}.nt")
+    if os.path.exists(nt_path):
+        st = os.stat(nt_path)
+        return nt_path, f"{st.st_size}-{st.st_mtime_ns}"
+    return None, None
+
+def open_source(name, processed_dir=PROCESSED_DATA):
+    """
+    Abre um grafo processado: o armazenamento compacto `<name>.hdt`, se existir, ou `<name>.nt`.
+    Retorna (fonte, impressão digital do snapshot), ou (None, None) se nenhum dos dois existir.
+    """
+    path, fingerprint = open_fingerprint(name, processed_dir)
+    if path is None:
+        return None, None
+    if path.endswith(".hdt"):
+        return TripleStore.open(path), fingerprint
+    return load_rdf_graph(path), fingerprint
+
+def snapshot_id(*fingerprints):
+    """
+    Identificador do snapshot a partir das impressões digitais das fontes e da versão das métricas.
+    """
+    parts = [f"v{ANALYTICS_VERSION}", *(f or "-" for f in fingerprints)]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def object_ids(index, predicate):
+    """
+    Para cada nó, o ID do objeto do predicado (-1 se não houver). Se houver vários, fica o de maior ID:
+    como os IDs seguem a ordem do texto N-Triples (ver GraphIndex), é o último objeto nessa ordem
+    (comparação de texto, não de valor numérico), o mesmo para um .nt ou um TripleStore.
+    """
+    objects = np.full(index.num_nodes, -1, dtype=np.int64)
+    src, dst, _ = index.edges(predicate)
+    np.maximum.at(objects, src, dst)
+    return objects
+
+def subjects_of_type(index, rdf_type):
+    """
+    IDs dos nós com o rdf:type informado.
+    """
+    type_id = index.node_id(rdf_type)
+    if type_id is None:
+        return np.zeros(0, dtype=np.int64)
+    src, dst, _ = index.edges(RDF.type)
+    return np.unique(src[dst == type_id]).astype(np.int64)
+
+def take(array, ids, missing=-1):
+    """
+    array[ids], devolvendo `missing` onde o ID é -1.
+    """
+    ids = np.asarray(ids)
+    return np.where(ids >= 0, array[np.maximum(ids, 0)], missing)
+
+def node_texts(index, ids):
+    """
+    Textos dos nós (None para -1), decodificando cada nó distinto uma única vez.
+    """
+    unique, inverse = np.unique(np.asarray(ids), return_inverse=True)
+    texts = np.array([index.label(i) if i >= 0 else None for i in unique.tolist()], dtype=object)
+    return texts[inverse]
+
+def node_numbers(index, ids):
+    """
+    Valores numéricos dos literais (NaN para -1 ou texto não numérico).
+    """
+    return pd.to_numeric(pd.Series(node_texts(index, ids)), errors="coerce").to_numpy(dtype=np.float64)
+
+def pagerank(matrix, damping=0.85, max_iter=100, tol=1e-6):
+    """
+    PageRank por iteração de potência sobre uma matriz de adjacência esparsa (CSR).
+    A massa dos nós sem arestas de saída é redistribuída uniformemente.
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inv_out = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    transposed = matrix.T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = rank
+        rank = damping * (transposed @ (previous * inv_out))
+        rank += (damping * previous[dangling].sum() + 1.0 - damping) / n
+        if np.abs(rank - previous).sum() < n * tol:
+            break
+    return rank
+
+def label_propagation(weights, max_iter=30):
+    """
+    Detecção de comunidades por propagação de rótulos (síncrona) sobre uma matriz de pesos simétrica:
+    a cada rodada, cada nó adota o rótulo de maior peso somado entre os vizinhos (empates: o menor rótulo).
+    Retorna um array com o número da comunidade de cada nó (0 = maior comunidade).
+    """
+    n = weights.shape[0]
+    labels = np.arange(n)
+    for _ in range(max_iter):
+        one_hot = sparse.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+        scores = weights @ one_hot
+        updated = np.asarray(scores.argmax(axis=1)).ravel()
+        # Nós isolados (sem pesos) mantêm o próprio rótulo
+        updated = np.where(np.diff(scores.indptr) > 0, updated, labels)
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    _, compact, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-sizes, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[compact]
+
+
+class GraphAnalytics:
+    """
+    Métricas do grafo de deputados (e das despesas) calculadas em memória, com matrizes esparsas
+    e NumPy sobre os grafos processados, sem consultar o Neo4j.
+
+    Cada resultado é um DataFrame guardado em cache por snapshot (memória e Parquet em
+    `cache_dir/<snapshot>`): uma nova transformação gera outro snapshot e as métricas são refeitas.
+    """
+
+    def __init__(self, deputados, despesas=None, snapshot=None, cache_dir=ANALYTICS_CACHE_DIR):
+        self.deputados_source = deputados
+        self.despesas_source = despesas
+        self.snapshot = snapshot
+        self.cache_dir = os.path.join(cache_dir, snapshot) if snapshot and cache_dir else None
+        self._results = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_processed(cls, processed_dir=PROCESSED_DATA, cache_dir=ANALYTICS_CACHE_DIR):
+        """
+        Abre os grafos de deputados e de despesas da legislatura configurada.
+        """
+        deputados, dep_fp = open_source(f"deputados_legisl_{ID_LEGISLATURA}", processed_dir)
+        if deputados is None:
+            raise FileNotFoundError(f"Grafo dos deputados não encontrado em '{processed_dir}'. Execute a transformação.")
+        despesas, desp_fp = open_source(f"deputados_despesas_legisl_{ID_LEGISLATURA}", processed_dir)
+        return cls(deputados, despesas, snapshot_id(dep_fp, desp_fp), cache_dir)
+
+    # --- Índices ---
+
+    def _memo(self, name, compute):
+        with self._lock:
+            if name not in self._results:
+                self._results[name] = compute()
+            return self._results[name]
+
+    @property
+    def deputados_index(self):
+        return self._memo("_deputados_index", lambda: GraphIndex.from_triples(self.deputados_source))
+
+    @property
+    def despesas_index(self):
+        return self._memo("_despesas_index", lambda: GraphIndex.from_triples(self.despesas_source))
+
+    def _cached(self, name, compute):
+        """
+        Resultado `name` do snapshot: memória, depois Parquet em disco, senão calcula e grava.
+        """
+        def load_or_compute():
+            path = os.path.join(self.cache_dir, f"{name}.parquet") if self.cache_dir else None
+            if path and os.path.exists(path):
+                return pd.read_parquet(path)
+            df = compute()
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                df.to_parquet(path, index=False)
+            return df
+        return self._memo(name, load_or_compute)
+
+    # --- Deputados ---
+
+    def _persons(self):
+        return self._memo("_persons", lambda: subjects_of_type(self.deputados_index, SCHEMA.Person))
+
+    def _incidence(self, predicate):
+        """
+        Matriz de incidência deputados x grupos (CSR 0/1) e os IDs de nó dos grupos.
+        """
+        index = self.deputados_index
+        persons = self._persons()
+        adjacency = index.to_csr(predicate)[persons]
+        groups = np.unique(adjacency.indices)
+        incidence = adjacency[:, groups]
+        incidence.data[:] = 1
+        return incidence.tocsr(), groups
+
+    def deputados(self):
+        """
+        Tabela dos deputados: uri, nome, partido e uf.
+        """
+        def compute():
+            index = self.deputados_index
+            persons = self._persons()
+            names = object_ids(index, SCHEMA.name)
+            data = {"uri": node_texts(index, persons), "nome": node_texts(index, names[persons])}
+            for column, predicate in GROUPS.items():
+                data[column] = node_texts(index, take(names, object_ids(index, predicate)[persons]))
+            return pd.DataFrame(data)
+        return self._cached("deputados", compute)
+
+    def centrality(self, damping=0.85):
+        """
+        Grau (entrada, saída, total) e PageRank dos recursos do grafo dos deputados.
+        Consideram-se apenas as arestas entre recursos (sem literais e sem rdf:type).
+        """
+        def compute():
+            index = self.deputados_index
+            src, dst, edge_type = index.edges()
+            keep = ~index.is_literal[dst]
+            type_id = index.predicate_id(RDF.type)
+            if type_id is not None:
+                keep &= edge_type != type_id
+            nodes, endpoints = np.unique(np.concatenate([src[keep], dst[keep]]), return_inverse=True)
+            k = int(keep.sum())
+            matrix = sparse.csr_matrix((np.ones(k), (endpoints[:k], endpoints[k:])), shape=(len(nodes),) * 2)
+
+            in_degree = np.asarray(matrix.sum(axis=0)).ravel().astype(np.int64)
+            out_degree = np.asarray(matrix.sum(axis=1)).ravel().astype(np.int64)
+            types = take(object_ids(index, RDF.type), nodes)
+            df = pd.DataFrame({
+                "uri": node_texts(index, nodes),
+                "nome": node_texts(index, take(object_ids(index, SCHEMA.name), nodes)),
+                "tipo": [t.rsplit("/", 1)[-1] if t else None for t in node_texts(index, types)],
+                "grau_entrada": in_degree,
+                "grau_saida": out_degree,
+                "grau": in_degree + out_degree,
+                "pagerank": pagerank(matrix, damping),
+            })
+            return df.sort_values("pagerank", ascending=False, kind="stable").reset_index(drop=True)
+        return self._cached("centrality", compute)
+
+    def membership(self, group="partido"):
+        """
+        Total de deputados por grupo ("partido" ou "uf").
+        """
+        def compute():
+            incidence, groups = self._incidence(GROUPS[group])
+            names = take(object_ids(self.deputados_index, SCHEMA.name), groups)
+            df = pd.DataFrame({
+                group: node_texts(self.deputados_index, names),
+                "total_deputados": np.asarray(incidence.sum(axis=0)).ravel().astype(np.int64),
+            })
+            # Agrupa pelo nome, como a consulta Cypher (grupos distintos podem ter o mesmo nome)
+            df = df.groupby(group, as_index=False)["total_deputados"].sum()
+            return df.sort_values(["total_deputados", group], ascending=[False, True]).reset_index(drop=True)
+        return self._cached(f"membership_{group}", compute)
+
+    def co_membership(self):
+        """
+        Projeção partido x UF: número de deputados de cada partido em cada estado
+        (produto das matrizes de incidência deputados x partidos e deputados x UFs).
+        """
+        def compute():
+            index = self.deputados_index
+            names = object_ids(index, SCHEMA.name)
+            partidos, partido_ids = self._incidence(GROUPS["partido"])
+            ufs, uf_ids = self._incidence(GROUPS["uf"])
+            projection = (partidos.T @ ufs).tocoo()
+            df = pd.DataFrame({
+                "partido": node_texts(index, take(names, partido_ids[projection.row])),
+                "uf": node_texts(index, take(names, uf_ids[projection.col])),
+                "deputados": projection.data.astype(np.int64),
+            })
+            df = df.groupby(["partido", "uf"], as_index=False)["deputados"].sum()
+            return df.sort_values(["deputados", "partido", "uf"], ascending=[False, True, True]).reset_index(drop=True)
+        return self._cached("co_membership", compute)
+
+    def communities(self, weights=None, max_iter=30):
+        """
+        Comunidades de deputados por propagação de rótulos sobre a projeção deputado x deputado
+        (deputados ligados quando compartilham partido e/ou UF; `weights` dá o peso de cada grupo).
+        """
+        weights = weights or {"partido": 1.0, "uf": 1.0}
+
+        def compute():
+            projection = None
+            for group, weight in weights.items():
+                incidence, _ = self._incidence(GROUPS[group])
+                term = weight * (incidence @ incidence.T)
+                projection = term if projection is None else projection + term
+            df = self.deputados().copy()
+            df["comunidade"] = label_propagation(projection.tocsr(), max_iter)
+            df["tamanho_comunidade"] = df.groupby("comunidade")["uri"].transform("size")
+            return df.sort_values(["comunidade", "nome"]).reset_index(drop=True)
+        key = "communities_" + "_".join(f"{g}{w:g}" for g, w in sorted(weights.items()))
+        return self._cached(key, compute)
+
+    # --- Despesas ---
+
+    def _expenses_frame(self):
+        """
+        Uma linha por despesa: deputado, partido, uf, fornecedor, cnpj_cpf, ano, mes e valor (líquido).
+        """
+        def compute():
+            index = self.despesas_index
+            invoices = subjects_of_type(index, SCHEMA.Invoice)
+            names = object_ids(index, SCHEMA.name)
+            providers = object_ids(index, SCHEMA.provider)[invoices]
+            df = pd.DataFrame({
+                "deputado": node_texts(index, object_ids(index, SCHEMA.customer)[invoices]),
+                "fornecedor": node_texts(index, take(names, providers)),
+                "cnpj_cpf": node_texts(index, take(object_ids(index, SCHEMA.taxID), providers)),
+                "ano": node_numbers(index, object_ids(index, POL.ano)[invoices]),
+                "mes": node_numbers(index, object_ids(index, POL.mes)[invoices]),
+                "valor": node_numbers(index, object_ids(index, SCHEMA.totalPaymentDue)[invoices]),
+            })
+            deputados = self.deputados()[["uri", "partido", "uf"]].rename(columns={"uri": "deputado"})
+            return df.merge(deputados, on="deputado", how="left")
+        return self._memo("_expenses", compute)
+
+    def expenses(self, by="partido"):
+        """
+        Despesas agregadas por "partido", "uf", "fornecedor" ou "mes":
+        valor total, número de despesas e de deputados.
+        """
+        columns = EXPENSE_GROUPS[by]
+
+        def compute():
+            if self.despesas_source is None:
+                return pd.DataFrame(columns=[*columns, "total", "despesas", "deputados"])
+            df = self._expenses_frame()
+            result = df.groupby(columns, dropna=False).agg(
+                total=("valor", "sum"), despesas=("valor", "size"), deputados=("deputado", "nunique")
+            ).reset_index()
+            if by == "mes":
+                result[columns] = result[columns].astype("Int64")
+                return result.sort_values(columns).reset_index(drop=True)
+            return result.sort_values("total", ascending=False).reset_index(drop=True)
+        return self._cached(f"expenses_{by}", compute)
+
+    def metrics(self):
+        """
+        Nomes e funções das métricas disponíveis (para os painéis).
+        """
+        return {
+            "Deputados": self.deputados,
+            "Centralidade (grau e PageRank)": self.centrality,
+            "Deputados por partido": lambda: self.membership("partido"),
+            "Deputados por UF": lambda: self.membership("uf"),
+            "Partidos x UFs": self.co_membership,
+            "Comunidades": self.communities,
+            "Despesas por partido": lambda: self.expenses("partido"),
+            "Despesas por UF": lambda: self.expenses("uf"),
+            "Despesas por fornecedor": lambda: self.expenses("fornecedor"),
+            "Despesas por mês": lambda: self.expenses("mes"),
+        }
+
+
+_analytics = {}
+_analytics_lock = threading.Lock()
+
+def get_analytics(processed_dir=PROCESSED_DATA):
+    """
+    Instância compartilhada de GraphAnalytics para o snapshot atual dos grafos processados.
+    Quando os arquivos mudam, uma nova instância (com cache novo) substitui a anterior.
+    """
+    _, dep_fp = open_fingerprint(f"deputados_legisl_{ID_LEGISLATURA}", processed_dir)
+    _, desp_fp = open_fingerprint(f"deputados_despesas_legisl_{ID_LEGISLATURA}", processed_dir)
+    snapshot = snapshot_id(dep_fp, desp_fp)
+    with _analytics_lock:
+        analytics = _analytics.get(processed_dir)
+        if analytics is None or analytics.snapshot != snapshot:
+            analytics = GraphAnalytics.from_processed(processed_dir)
+            _analytics[processed_dir] = analytics
+        return analytics
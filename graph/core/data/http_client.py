@@ -0,0 +1,147 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from graph.config import HTTP_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX
+
+
+# Status HTTP considerados transitórios (vale a pena tentar novamente)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+DEFAULT_HEADERS = {"accept": "application/json"}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def parse_retry_after(value):
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera.
+    Retorna None se o valor estiver ausente ou for inválido.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+
+def compute_backoff(attempt, retry_after=None, base=HTTP_BACKOFF_BASE, cap=HTTP_BACKOFF_MAX):
+    """
+    Tempo de espera antes da próxima tentativa: respeita o Retry-After do servidor
+    quando presente; caso contrário, backoff exponencial com jitter completo.
+    """
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def get_session(pool_size=10):
+    """
+    Retorna uma sessão HTTP compartilhada (keep-alive) com pool de conexões
+    dimensionado para `pool_size` requisições simultâneas.
+    """
+    with _sessions_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[pool_size] = session
+        return session
+
+def _governed(governor):
+    return governor.slot() if governor else nullcontext()
+
+def get_json(url, params=None, session=None, timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES, governor=None):
+    """
+    GET com timeout, repetindo em falhas de conexão e status transitórios (429/5xx).
+    Se um `governor` (AIMDGovernor) for informado, ele limita as requisições em andamento
+    e recebe a latência/status de cada tentativa.
+    Lança requests.RequestException quando as tentativas se esgotam.
+    """
+    session = session or get_session()
+
+    for attempt in range(max_retries + 1):
+        try:
+            with _governed(governor):
+                start = time.monotonic()
+                try:
+                    response = session.get(url, params=params, timeout=timeout)
+                except (requests.ConnectionError, requests.Timeout):
+                    if governor:
+                        governor.record(time.monotonic() - start, error=True)
+                    raise
+                if governor:
+                    governor.record(time.monotonic() - start, response.status_code)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_retries:
+                raise
+            time.sleep(compute_backoff(attempt))
+            continue
+
+        if response.status_code in RETRY_STATUS and attempt < max_retries:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            response.close()
+            time.sleep(compute_backoff(attempt, retry_after))
+            continue
+
+        response.raise_for_status()
+        return response.json()
+
+def create_async_session(max_concurrency, limit_per_host, timeout=HTTP_TIMEOUT):
+    """
+    Cria a sessão aiohttp compartilhada da extração assíncrona,
+    com limite total de conexões e limite por host.
+    """
+    connector = aiohttp.TCPConnector(limit=max_concurrency, limit_per_host=limit_per_host)
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=DEFAULT_HEADERS,
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+
+async def get_json_async(session, url, params=None, semaphore=None, max_retries=HTTP_MAX_RETRIES, governor=None):
+    """
+    Versão assíncrona de get_json. O limite de requisições em andamento vem do `governor`
+    (AIMDGovernor) ou do semáforo; em ambos os casos a vaga é liberada durante a espera entre tentativas.
+    """
+    if governor is None:
+        semaphore = semaphore or asyncio.Semaphore(1)
+
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        try:
+            async with (governor.async_slot() if governor else semaphore):
+                start = time.monotonic()
+                try:
+                    async with session.get(url, params=params) as response:
+                        if governor:
+                            governor.record(time.monotonic() - start, response.status)
+                        if response.status in RETRY_STATUS and attempt < max_retries:
+                            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        else:
+                            response.raise_for_status()
+                            return await response.json()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if governor:
+                        governor.record(time.monotonic() - start, error=True)
+                    raise
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == max_retries:
+                raise
+
+        await asyncio.sleep(compute_backoff(attempt, retry_after))
@@ -1,5 +1,53 @@
+import csv
+import json
 import os
+import operator
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+# Esquemas explícitos das tabelas brutas (Parquet)
+DEPUTADOS_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("uri", pa.string()),
+    ("nome", pa.string()),
+    ("siglaPartido", pa.string()),
+    ("uriPartido", pa.string()),
+    ("siglaUf", pa.string()),
+    ("idLegislatura", pa.int32()),
+    ("urlFoto", pa.string()),
+    ("email", pa.string()),
+])
+
+DESPESAS_SCHEMA = pa.schema([
+    ("ano", pa.int16()),
+    ("mes", pa.int8()),
+    ("tipoDespesa", pa.string()),
+    ("codDocumento", pa.int64()),
+    ("tipoDocumento", pa.string()),
+    ("codTipoDocumento", pa.int32()),
+    ("dataDocumento", pa.string()),
+    ("numDocumento", pa.string()),
+    ("valorDocumento", pa.float64()),
+    ("urlDocumento", pa.string()),
+    ("nomeFornecedor", pa.string()),
+    ("cnpjCpfFornecedor", pa.string()),
+    ("valorLiquido", pa.float64()),
+    ("valorGlosa", pa.float64()),
+    ("numRessarcimento", pa.string()),
+    ("codLote", pa.int64()),
+    ("parcela", pa.int32()),
+    ("deputado_id", pa.int64()),
+    ("deputado_nome", pa.string()),
+])
+
+_FILTER_OPS = {
+    "==": operator.eq, "=": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
 
 
 def save_to_csv(data, filepath):
@@ -17,4 +65,186 @@ def load_csv(filepath):
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"O arquivo {filepath} não foi encontrado!")
-    return pd.read_csv(filepath)
\ No newline at end of file
+    return pd.read_csv(filepath)
+
+def load_json(filepath, default=None):
+    """
+    Carrega um arquivo JSON. Retorna `default` se o arquivo não existir.
+    """
+    if not os.path.exists(filepath):
+        return default
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_json(data, filepath):
+    """
+    Salva um arquivo JSON de forma atômica (escreve em um temporário e substitui).
+    """
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+class CsvStreamWriter:
+    """
+    Escreve registros (dicts) em um CSV de forma incremental, com esquema fixo
+    e escrita em buffer. Campos ausentes ficam vazios; campos fora do esquema geram um aviso
+    (uma vez por campo) e não são gravados, ou um ValueError com `strict=True`.
+    """
+
+    def __init__(self, filepath, columns, buffer_size=5000, strict=False):
+        self.filepath = filepath
+        self.columns = list(columns)
+        self.buffer_size = buffer_size
+        self.strict = strict
+        self.unknown_fields = set()
+        self._known = set(self.columns)
+        self.rows = 0
+        self._buffer = []
+        self._file = open(filepath, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore", lineterminator=os.linesep)
+        self._writer.writeheader()
+
+    def _check_fields(self, rows):
+        for row in rows:
+            extras = row.keys() - self._known
+            if extras - self.unknown_fields:
+                if self.strict:
+                    raise ValueError(f"Campos fora do esquema de {self.filepath}: {sorted(extras)}")
+                print(f"[AVISO] Campos fora do esquema não gravados em {self.filepath}: {sorted(extras - self.unknown_fields)}")
+                self.unknown_fields |= extras
+
+    def write_rows(self, rows):
+        rows = list(rows)
+        self._check_fields(rows)
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self._writer.writerows(self._buffer)
+        self.rows += len(self._buffer)
+        self._buffer = []
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def discard(self):
+        """
+        Fecha sem gravar o buffer e apaga o arquivo (se ainda existir), ex.: após uma falha.
+        """
+        self._buffer = []
+        self._file.close()
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def parquet_path(filepath):
+    """
+    Caminho do arquivo Parquet correspondente a um CSV (mesmo nome, extensão .parquet).
+    """
+    return os.path.splitext(filepath)[0] + ".parquet"
+
+def resolve_table_path(csv_path):
+    """
+    Retorna o Parquet equivalente ao CSV se ele existir e estiver atualizado; senão, o próprio CSV.
+    """
+    pq_path = parquet_path(csv_path)
+    if os.path.exists(pq_path) and (not os.path.exists(csv_path) or os.path.getmtime(pq_path) >= os.path.getmtime(csv_path)):
+        return pq_path
+    return csv_path
+
+def save_to_parquet(data, filepath, schema=None):
+    """
+    Salva em um arquivo Parquet (compressão zstd), convertendo as colunas para o `schema` informado.
+    """
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    if schema is not None:
+        df = df.reindex(columns=schema.names)
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    pq.write_table(table, filepath, compression="zstd")
+    print(f"[INFO] Arquivo Parquet '{filepath}' salvo com sucesso!")
+
+def csv_to_parquet(csv_path, filepath=None, schema=None, block_size=1 << 24):
+    """
+    Converte um CSV em Parquet em streaming (lote a lote), sem carregar o arquivo inteiro.
+    """
+    filepath = filepath or parquet_path(csv_path)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=schema,
+        include_columns=schema.names if schema is not None else None,
+        strings_can_be_null=True,
+        include_missing_columns=True
+    )
+    reader = pa_csv.open_csv(csv_path, read_options=pa_csv.ReadOptions(block_size=block_size), convert_options=convert_options)
+
+    with pq.ParquetWriter(filepath, schema or reader.schema, compression="zstd") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+    print(f"[INFO] Arquivo Parquet '{filepath}' salvo com sucesso!")
+    return filepath
+
+def _apply_filters(df, filters):
+    for column, op, value in filters:
+        if op == "in":
+            df = df[df[column].isin(value)]
+        elif op == "not in":
+            df = df[~df[column].isin(value)]
+        else:
+            df = df[_FILTER_OPS[op](df[column], value)]
+    return df
+
+def load_table(filepath, columns=None, filters=None, schema=None):
+    """
+    Carrega uma tabela (Parquet ou CSV) em um DataFrame pandas.
+
+    `columns` restringe as colunas lidas (projeção) e `filters` é uma lista de
+    tuplas (coluna, operador, valor), ex.: [("ano", ">=", 2024)].
+    No Parquet, os filtros são aplicados na leitura (predicate pushdown);
+    no CSV, depois da leitura.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"O arquivo {filepath} não foi encontrado!")
+
+    if filepath.endswith(".parquet"):
+        return pq.read_table(filepath, columns=columns, filters=filters or None, schema=schema).to_pandas()
+
+    usecols = columns
+    if filters and columns:
+        usecols = list(dict.fromkeys([*columns, *(f[0] for f in filters)]))
+    df = pd.read_csv(filepath, usecols=usecols)
+    if filters:
+        df = _apply_filters(df, filters)
+        if columns:
+            df = df[columns]
+    return df
+
+def iter_table_chunks(filepath, chunksize=50_000, columns=None, filters=None):
+    """
+    Percorre uma tabela (Parquet ou CSV) em blocos de até `chunksize` linhas,
+    sem carregar o arquivo inteiro na memória.
+    `filters` segue o formato de load_table; no Parquet, é aplicado na leitura.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"O arquivo {filepath} não foi encontrado!")
+
+    if filepath.endswith(".parquet"):
+        dataset = ds.dataset(filepath, format="parquet")
+        expression = pq.filters_to_expression(filters) if filters else None
+        for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+            if batch.num_rows:
+                yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(filepath, chunksize=chunksize, usecols=columns):
+            yield _apply_filters(chunk, filters) if filters else chunk
@@ -0,0 +1,288 @@
+import os
+import json
+import math
+import hashlib
+from collections import defaultdict
+import numpy as np
+import networkx as nx
+from graph.config import LAYOUT_CACHE_DIR
+
+try:
+    import pygraphviz  # noqa: F401 (dependência opcional, usada pelo sfdp)
+    HAS_GRAPHVIZ = True
+except ImportError:
+    HAS_GRAPHVIZ = False
+
+
+LAYOUTS = ("auto", "sfdp", "multilevel", "forceatlas2", "spring", "shell", "hierarchical")
+
+# Acima deste número de nós, o layout automático troca o spring (O(n²) por iteração) por um multinível,
+# cuja repulsão nos níveis grandes considera apenas os nós vizinhos numa grade (ver force_refine)
+LARGE_GRAPH_NODES = 300
+
+# Tamanho do grafo mais grosso do layout multinível, posicionado com o spring completo
+COARSE_GRAPH_NODES = 100
+
+
+def structural_hash(nx_graph, algorithm, seed=42, root=None):
+    """
+    Hash da estrutura do grafo (nós e arestas, sem atributos) e dos parâmetros do layout
+    (incluindo a raiz dos layouts por níveis), usado como chave do cache de posições.
+    """
+    edges = sorted((str(u), str(v)) for u, v in nx_graph.edges())
+    payload = {
+        "directed": nx_graph.is_directed(),
+        "nodes": sorted(str(n) for n in nx_graph.nodes()),
+        "edges": edges,
+        "algorithm": algorithm,
+        "seed": seed,
+        "root": None if root is None else str(root),
+    }
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def find_root(nx_graph):
+    """
+    Nó central do grafo (maior grau), como o deputado no grafo estrela deputado → partido/UF.
+    """
+    return max(nx_graph.degree(), key=lambda item: (item[1], str(item[0])))[0]
+
+def is_star_like(nx_graph, min_share=0.5):
+    """
+    Indica se um único nó está ligado a pelo menos `min_share` dos demais (formato estrela).
+    """
+    n = nx_graph.number_of_nodes()
+    if n < 3:
+        return False
+    root = find_root(nx_graph)
+    return nx_graph.to_undirected(as_view=True).degree(root) >= min_share * (n - 1)
+
+def bfs_levels(nx_graph, root=None):
+    """
+    Níveis da busca em largura a partir da raiz (sem considerar o sentido das arestas).
+    Componentes não alcançados ficam no último nível.
+    """
+    root = root if root is not None else find_root(nx_graph)
+    depth = nx.single_source_shortest_path_length(nx_graph.to_undirected(as_view=True), root)
+    last = max(depth.values()) + 1
+    levels = {}
+    for node in nx_graph.nodes():
+        levels.setdefault(depth.get(node, last), []).append(node)
+    return [sorted(levels[k], key=str) for k in sorted(levels)]
+
+def peel_leaves(graph, max_levels=3):
+    """
+    Remove as folhas (grau 1) em até `max_levels` rodadas, como os deputados presos a um partido
+    ou as despesas presas a um fornecedor. Retorna (núcleo, [{folha: pai}, ...]) por rodada.
+    """
+    core = graph
+    levels = []
+    for _ in range(max_levels):
+        level = {n: next(iter(core[n])) for n in core if core.degree(n) == 1}
+        # Em um par isolado (a - b), apenas um dos dois é removido
+        level = {n: parent for n, parent in level.items() if parent not in level or str(n) > str(parent)}
+        if not level or len(level) == len(core):
+            break
+        levels.append(level)
+        core = core.subgraph(set(core) - set(level)).copy()
+    return core, levels
+
+def _pairwise_repulsion(xy, k, block):
+    """
+    Repulsão de Fruchterman-Reingold entre todos os pares, em blocos de `block` linhas.
+    """
+    displacement = np.zeros_like(xy)
+    for start in range(0, len(xy), block):
+        delta = xy[start:start + block, None, :] - xy[None, :, :]
+        dist2 = np.maximum((delta ** 2).sum(axis=-1), 1e-9)
+        displacement[start:start + block] = (delta * (k * k / dist2)[..., None]).sum(axis=1)
+    return displacement
+
+def _grid_repulsion(xy, k):
+    """
+    Repulsão apenas entre nós a menos de 2k, procurados nas 9 células vizinhas de uma grade
+    de lado 2k (variante em grade do Fruchterman-Reingold): custo proporcional ao número de
+    pares próximos, e não a n².
+    """
+    n = len(xy)
+    cell = 2 * k
+    ij = np.floor((xy - xy.min(axis=0)) / cell).astype(np.int64) + 1
+    width = int(ij[:, 0].max()) + 2
+    cell_id = ij[:, 1] * width + ij[:, 0]
+    order = np.argsort(cell_id, kind="stable")
+    sorted_ids = cell_id[order]
+
+    displacement = np.zeros((n, 2), dtype=np.float64)
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            target = cell_id + dy * width + dx
+            lo = np.searchsorted(sorted_ids, target, "left")
+            counts = np.searchsorted(sorted_ids, target, "right") - lo
+            total = int(counts.sum())
+            if not total:
+                continue
+            i = np.repeat(np.arange(n), counts)
+            j = order[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(total)]
+            delta = xy[i] - xy[j]
+            dist2 = (delta ** 2).sum(axis=1)
+            near = (i != j) & (dist2 < cell * cell)
+            i, delta, dist2 = i[near], delta[near], np.maximum(dist2[near], 1e-9)
+            force = delta * (k * k / dist2)[:, None]
+            displacement[:, 0] += np.bincount(i, weights=force[:, 0], minlength=n)
+            displacement[:, 1] += np.bincount(i, weights=force[:, 1], minlength=n)
+    return displacement.astype(xy.dtype)
+
+def force_refine(graph, pos, iterations=10, temperature=None, block=1024):
+    """
+    Iterações de Fruchterman-Reingold vetorizadas com NumPy a partir de posições iniciais.
+    Até `block` nós a repulsão é calculada entre todos os pares; acima disso, só entre nós
+    próximos (ver _grid_repulsion), mantendo cada iteração quase linear no número de nós.
+    `temperature` é o deslocamento máximo inicial (por padrão, 10% da extensão do layout).
+    """
+    nodes = list(graph)
+    n = len(nodes)
+    if n < 2 or iterations <= 0:
+        return pos
+    index = {node: i for i, node in enumerate(nodes)}
+    xy = np.array([pos[node] for node in nodes], dtype=np.float32)
+    edges = np.array([(index[a], index[b]) for a, b in graph.edges()], dtype=np.int64).reshape(-1, 2)
+
+    k = math.sqrt(1.0 / n)
+    if temperature is None:
+        temperature = 0.1 * max(float(np.ptp(xy[:, 0])), float(np.ptp(xy[:, 1])), 1e-3)
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        displacement = _pairwise_repulsion(xy, k, block) if n <= block else _grid_repulsion(xy, k)
+        if len(edges):
+            delta = xy[edges[:, 0]] - xy[edges[:, 1]]
+            force = delta * (np.linalg.norm(delta, axis=1) / k)[:, None]
+            np.subtract.at(displacement, edges[:, 0], force)
+            np.add.at(displacement, edges[:, 1], force)
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        xy += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    xy = nx.rescale_layout(xy)
+    return {node: xy[i] for i, node in enumerate(nodes)}
+
+def _coarsened_layout(graph, seed, refine_iterations):
+    """
+    Layout por contração sucessiva (emparelhamento maximal): o grafo mais grosso é posicionado
+    com o spring completo e cada nível mais fino parte das posições do nível anterior,
+    com poucas iterações de refinamento (force_refine).
+    """
+    if graph.number_of_nodes() <= COARSE_GRAPH_NODES:
+        return nx.spring_layout(graph, seed=seed) if graph.number_of_nodes() else {}
+
+    rng = np.random.default_rng(seed)
+    representative = {n: n for n in graph}
+    for a, b in nx.maximal_matching(graph):
+        representative[b] = a
+    coarse = nx.Graph()
+    coarse.add_nodes_from(set(representative.values()))
+    coarse.add_edges_from((representative[a], representative[b]) for a, b in graph.edges()
+                          if representative[a] != representative[b])
+
+    if coarse.number_of_nodes() > 0.9 * graph.number_of_nodes():
+        # O emparelhamento quase não reduz o grafo (ex.: estrelas): refina a partir de posições aleatórias
+        initial = {n: rng.uniform(-1, 1, 2) for n in graph}
+        return force_refine(graph, initial, refine_iterations * 5)
+
+    coarse_pos = _coarsened_layout(coarse, seed, refine_iterations)
+    jitter = 0.01 / math.sqrt(graph.number_of_nodes())
+    initial = {n: np.asarray(coarse_pos[representative[n]]) + rng.normal(0, jitter, 2) for n in graph}
+    # Os níveis finos já partem de boas posições: passos curtos (da ordem da distância ideal
+    # entre nós) e menos iterações quanto maior o nível
+    iterations = max(5, refine_iterations * COARSE_GRAPH_NODES // graph.number_of_nodes())
+    return force_refine(graph, initial, iterations, temperature=2 * math.sqrt(1.0 / graph.number_of_nodes()))
+
+def multilevel_layout(nx_graph, seed=42, refine_iterations=20):
+    """
+    Layout multinível para grafos grandes: remove as folhas, posiciona o núcleo por contração
+    sucessiva (ver _coarsened_layout) e recoloca as folhas em círculo em volta de cada pai.
+    """
+    graph = nx.Graph(nx_graph.to_undirected(as_view=True))
+    graph.remove_edges_from(list(nx.selfloop_edges(graph)))
+    core, levels = peel_leaves(graph)
+    pos = _coarsened_layout(core, seed, refine_iterations)
+
+    # Raio base: metade do comprimento mediano das arestas do núcleo
+    lengths = [math.dist(pos[a], pos[b]) for a, b in core.edges()]
+    base = 0.5 * float(np.median(lengths)) if lengths else 0.1
+
+    for depth, level in enumerate(reversed(levels)):
+        children = defaultdict(list)
+        for leaf, parent in level.items():
+            children[parent].append(leaf)
+        for parent, leaves in children.items():
+            cx, cy = pos[parent]
+            radius = base * (0.6 ** depth) * (1 + 0.15 * math.sqrt(len(leaves)))
+            for i, leaf in enumerate(sorted(leaves, key=str)):
+                angle = 2 * math.pi * i / len(leaves)
+                pos[leaf] = (cx + radius * math.cos(angle), cy + radius * math.sin(angle))
+
+    return {n: tuple(float(v) for v in xy) for n, xy in pos.items()}
+
+def choose_layout(nx_graph):
+    """
+    Escolha automática: layout radial por níveis para grafos em estrela, multinível (sfdp, se o
+    pygraphviz estiver instalado) para grafos grandes e spring para os demais.
+    """
+    if is_star_like(nx_graph):
+        return "shell"
+    if nx_graph.number_of_nodes() > LARGE_GRAPH_NODES:
+        return "sfdp" if HAS_GRAPHVIZ else "multilevel"
+    return "spring"
+
+def compute_layout(nx_graph, algorithm="auto", seed=42, root=None):
+    """
+    Calcula as posições dos nós com o algoritmo escolhido (ver LAYOUTS).
+    """
+    if algorithm == "auto":
+        algorithm = choose_layout(nx_graph)
+    if nx_graph.number_of_nodes() == 0:
+        return {}
+
+    if algorithm == "sfdp":
+        if not HAS_GRAPHVIZ:
+            raise ImportError("O layout 'sfdp' requer o pacote opcional pygraphviz.")
+        return nx.nx_agraph.graphviz_layout(nx_graph, prog="sfdp")
+    if algorithm == "multilevel":
+        return multilevel_layout(nx_graph, seed)
+    if algorithm == "forceatlas2":
+        return nx.forceatlas2_layout(nx_graph, seed=seed, max_iter=100, dissuade_hubs=True)
+    if algorithm == "spring":
+        return nx.spring_layout(nx_graph, seed=seed)
+    if algorithm == "shell":
+        return nx.shell_layout(nx_graph, nlist=bfs_levels(nx_graph, root))
+    if algorithm == "hierarchical":
+        layered = nx.Graph()
+        for depth, nodes in enumerate(bfs_levels(nx_graph, root)):
+            layered.add_nodes_from(nodes, layer=depth)
+        return nx.multipartite_layout(layered, subset_key="layer", align="horizontal")
+    raise ValueError(f"Layout desconhecido: {algorithm}. Opções: {', '.join(LAYOUTS)}")
+
+def get_layout(nx_graph, algorithm="auto", seed=42, root=None, cache_dir=LAYOUT_CACHE_DIR):
+    """
+    Posições dos nós com cache em disco: grafos com a mesma estrutura (mesmo hash)
+    reutilizam as posições já calculadas. Use `cache_dir=None` para desativar o cache.
+    """
+    if algorithm == "auto":
+        algorithm = choose_layout(nx_graph)
+    if cache_dir is None:
+        return compute_layout(nx_graph, algorithm, seed, root)
+
+    key = structural_hash(nx_graph, algorithm, seed, root)
+    path = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        by_name = {str(n): n for n in nx_graph.nodes()}
+        return {by_name[name]: tuple(xy) for name, xy in cached.items() if name in by_name}
+
+    pos = compute_layout(nx_graph, algorithm, seed, root)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({str(n): [float(x), float(y)] for n, (x, y) in pos.items()}, f)
+    os.replace(tmp_path, path)
+    return pos
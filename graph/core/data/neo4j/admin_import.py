@@ -0,0 +1,194 @@
+import os
+import csv
+import tempfile
+from datetime import date, datetime, time
+import numpy as np
+from rdflib import RDF, XSD, URIRef
+from graph.config import NEO4J_DATABASE
+from graph.core.data.rdf.nt_writer import from_nt_term
+from graph.core.data.rdf.triple_store import TripleStore, build_triple_store
+from graph.core.data.neo4j.bulk_loader import map_name, literal_value
+
+
+# Tipos do cabeçalho do neo4j-admin para os datatypes XSD (o resto vira string)
+XSD_TYPES = {
+    XSD.integer: "long", XSD.int: "long", XSD.long: "long", XSD.short: "long",
+    XSD.nonNegativeInteger: "long", XSD.positiveInteger: "long",
+    XSD.decimal: "double", XSD.double: "double", XSD.float: "double",
+    XSD.boolean: "boolean",
+    XSD.date: "date",
+    XSD.dateTime: "localdatetime",
+}
+
+ID_SPACE = "Resource"
+
+
+def _literal_type(text):
+    """
+    Tipo neo4j-admin de um literal em forma N-Triples (pelo datatype).
+    """
+    pos = text.rfind('"^^<')
+    if pos < 0:
+        return "string"
+    return XSD_TYPES.get(URIRef(text[pos + 4:-1]), "string")
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+def _node_id(text):
+    """
+    ID do nó no arquivo de importação: a URI (ou o rótulo do blank node), como a propriedade `uri`.
+    """
+    return str(from_nt_term(text))
+
+def _safe_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name) or "Resource"
+
+class _CsvFiles:
+    """
+    Arquivos CSV abertos sob demanda (um por conjunto de rótulos ou tipo de relação).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+
+    def writer(self, name, header):
+        if name not in self.files:
+            f = open(os.path.join(self.directory, name), "w", newline="", encoding="utf-8")
+            w = csv.writer(f)
+            w.writerow(header)
+            self.files[name] = (f, w)
+        return self.files[name][1]
+
+    def close(self):
+        for f, _ in self.files.values():
+            f.close()
+
+def _schema(store, spo, type_id, first_non_literal):
+    """
+    Calcula, sem percorrer as triplas uma a uma, os rótulos de cada sujeito e as colunas
+    (propriedade, tipo) de cada conjunto de rótulos.
+    """
+    s, p, o = spo
+    is_type = p == type_id
+    labels = {}
+    for subject, label in zip(s[is_type].tolist(), o[is_type].tolist()):
+        labels.setdefault(subject, []).append(map_name(store.term(label)))
+    labels = {subject: tuple(sorted(set(names))) for subject, names in labels.items()}
+
+    label_keys = sorted(set(labels.values()))
+    key_index = {key: i + 1 for i, key in enumerate(label_keys)}
+    label_of = np.zeros(store.num_terms, dtype=np.int32)
+    if labels:
+        label_of[np.fromiter(labels.keys(), dtype=np.int64)] = [key_index[k] for k in labels.values()]
+
+    is_literal = o < first_non_literal
+    pairs = np.unique(np.stack([label_of[s[is_literal]], p[is_literal]]), axis=1)
+
+    # Tipo de cada predicado literal; datatypes mistos viram string
+    prop_types = {}
+    for predicate in np.unique(p[is_literal]).tolist():
+        kinds = {_literal_type(store.term_text(t)) for t in np.unique(o[is_literal & (p == predicate)]).tolist()}
+        prop_types[predicate] = kinds.pop() if len(kinds) == 1 else "string"
+
+    columns = {0: {}}
+    columns.update({i: {} for i in key_index.values()})
+    for key, predicate in pairs.T.tolist():
+        columns[key].setdefault(map_name(store.term(predicate)), prop_types[predicate])
+
+    keys = {0: ()}
+    keys.update({i: key for key, i in key_index.items()})
+    return label_of, keys, columns
+
+def export_admin_import(nt_paths=None, output_dir=None, store_dir=None, database=NEO4J_DATABASE):
+    """
+    Gera os CSVs de nós e relações para `neo4j-admin database import full` a partir do RDF processado
+    (arquivos .nt ou um armazenamento compacto já gerado), no mesmo modelo da estratégia MAP
+    do rdflib-neo4j: rótulo Resource + tipo, propriedade `uri`, literais como propriedades e URIs como relações.
+
+    Cada nó é escrito uma única vez (o índice spo agrupa as triplas por sujeito) e os cabeçalhos
+    trazem os tipos das propriedades. Retorna o comando de importação.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        if store_dir is None:
+            store_dir = build_triple_store(nt_paths, os.path.join(tmp, "store"))
+        store = TripleStore.open(store_dir)
+        command = _export_store(store, output_dir, database)
+
+    with open(os.path.join(output_dir, "import.sh"), "w", encoding="utf-8") as f:
+        f.write(command + "\n")
+    print(f"[INFO] Arquivos de importação gerados em '{output_dir}'. Comando:\n{command}")
+    return command
+
+def _export_store(store, output_dir, database):
+    spo = np.asarray(store.index("spo"))
+    s, p, o = spo
+    type_id = store.lookup(RDF.type)
+    type_id = -1 if type_id is None else type_id
+    first_non_literal = store.first_resource_id
+
+    label_of, keys, columns = _schema(store, spo, type_id, first_non_literal)
+    files = _CsvFiles(output_dir)
+    node_files, rel_files = {}, {}
+
+    def node_writer(key):
+        labels = keys[key]
+        name = f"nodes_{_safe_name('_'.join(labels) or 'Resource')}.csv"
+        props = list(columns[key].items())
+        header = [f"uri:ID({ID_SPACE})", ":LABEL"] + [f"{prop}:{kind}" for prop, kind in props]
+        node_files[name] = [prop for prop, _ in props]
+        return name, files.writer(name, header), ";".join(("Resource",) + labels)
+
+    try:
+        writers = {}
+        term = store.term
+        prop_name = {}
+
+        # Nós com triplas próprias: um grupo contíguo por sujeito no índice spo
+        bounds = np.flatnonzero(np.diff(s)) + 1
+        starts = np.concatenate([[0], bounds]) if len(s) else np.zeros(0, dtype=np.int64)
+        ends = np.concatenate([bounds, [len(s)]]) if len(s) else np.zeros(0, dtype=np.int64)
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            subject = int(s[start])
+            key = int(label_of[subject])
+            if key not in writers:
+                writers[key] = node_writer(key)
+            name, writer, label_value = writers[key]
+            values = {}
+            for predicate, obj in zip(p[start:end].tolist(), o[start:end].tolist()):
+                if obj < first_non_literal:
+                    if predicate not in prop_name:
+                        prop_name[predicate] = map_name(term(predicate))
+                    values[prop_name[predicate]] = _format_value(literal_value(term(obj)))
+            writer.writerow([_node_id(store.term_text(subject)), label_value] + [values.get(c, "") for c in node_files[name]])
+
+        # Nós que só aparecem como objeto de relações (classes de rdf:type viram rótulos, não nós)
+        is_rel = (o >= first_non_literal) & (p != type_id)
+        for obj in np.setdiff1d(np.unique(o[is_rel]), np.unique(s), assume_unique=True).tolist():
+            if 0 not in writers:
+                writers[0] = node_writer(0)
+            name, writer, label_value = writers[0]
+            writer.writerow([_node_id(store.term_text(obj)), label_value] + [""] * len(node_files[name]))
+
+        # Relações: uma por tripla (s, p, o) com objeto URI, já sem duplicatas no armazenamento
+        for predicate in np.unique(p[is_rel]).tolist():
+            rel_type = map_name(term(predicate))
+            name = f"rels_{_safe_name(rel_type)}.csv"
+            writer = files.writer(name, [f":START_ID({ID_SPACE})", f":END_ID({ID_SPACE})", ":TYPE"])
+            rel_files[name] = rel_type
+            mask = is_rel & (p == predicate)
+            for a, b in zip(s[mask].tolist(), o[mask].tolist()):
+                writer.writerow([_node_id(store.term_text(a)), _node_id(store.term_text(b)), rel_type])
+    finally:
+        files.close()
+
+    args = ["neo4j-admin database import full", database, "--overwrite-destination", "--multiline-fields=true"]
+    args += [f"--nodes={os.path.join(output_dir, name)}" for name in sorted(node_files)]
+    args += [f"--relationships={os.path.join(output_dir, name)}" for name in sorted(rel_files)]
+    return " \\\n    ".join(args)
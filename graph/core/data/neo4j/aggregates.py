@@ -0,0 +1,203 @@
+import time
+from collections import defaultdict
+from rdflib import RDF
+from graph.config import NEO4J_DATABASE, NEO4J_BATCH_SIZE
+from graph.core.data.neo4j.driver import get_session
+from graph.core.data.rdf.rdf_utils import SCHEMA, POL
+
+
+# Propriedades materializadas nos nós do RDF (não vêm de triplas; ignoradas ao apagar nós vazios)
+AGGREGATE_PROPERTIES = ("total_deputados", "total_despesas", "num_despesas")
+
+# Predicados que ligam o deputado aos grupos (partido e UF)
+GROUP_PREDICATES = (SCHEMA.memberOf, SCHEMA.addressRegion)
+GROUP_TYPES = (SCHEMA.Organization, SCHEMA.Place)
+
+SCHEMA_QUERIES = [
+    "CREATE CONSTRAINT despesa_mensal_id IF NOT EXISTS FOR (m:DespesaMensal) REQUIRE m.id IS UNIQUE",
+    "CREATE INDEX invoice_ano_mes IF NOT EXISTS FOR (i:Invoice) ON (i.ano, i.mes)",
+]
+
+# Mês e deputado atuais das despesas afetadas (depois da carga)
+INVOICE_CONTEXT_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (i:Resource {uri: row.uri}) "
+    "OPTIONAL MATCH (i)-[:customer]->(d:Resource) "
+    "RETURN i.uri AS uri, i.ano AS ano, i.mes AS mes, d.uri AS deputado"
+)
+
+PERSON_GROUPS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (:Resource {uri: row.uri})-[:memberOf|addressRegion]->(g:Resource) "
+    "RETURN DISTINCT g.uri AS uri"
+)
+
+REFRESH_PERSONS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (d:Person {uri: row.uri}) "
+    "OPTIONAL MATCH (i:Invoice)-[:customer]->(d) "
+    "WITH d, sum(coalesce(i.totalPaymentDue, 0)) AS total, count(i) AS n "
+    "SET d.total_despesas = total, d.num_despesas = n"
+)
+
+REFRESH_GROUPS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (g:Resource {uri: row.uri}) WHERE g:Organization OR g:Place "
+    "OPTIONAL MATCH (d:Person)-[:memberOf|addressRegion]->(g) "
+    "WITH g, count(d) AS total, sum(coalesce(d.total_despesas, 0)) AS despesas "
+    "SET g.total_deputados = total, g.total_despesas = despesas"
+)
+
+REFRESH_MONTHS_QUERY = (
+    "UNWIND $rows AS row "
+    "MERGE (m:DespesaMensal {id: row.id}) "
+    "SET m.ano = row.ano, m.mes = row.mes "
+    "WITH m, row "
+    "OPTIONAL MATCH (i:Invoice) WHERE i.ano = row.ano AND i.mes = row.mes "
+    "WITH m, sum(coalesce(i.totalPaymentDue, 0)) AS total, count(i) AS n "
+    "SET m.total = total, m.despesas = n"
+)
+
+DELETE_EMPTY_MONTHS_QUERY = "MATCH (m:DespesaMensal) WHERE m.despesas = 0 DELETE m"
+
+ALL_PERSONS_QUERY = "MATCH (d:Person) RETURN d.uri AS uri"
+ALL_GROUPS_QUERY = "MATCH (g:Resource) WHERE g:Organization OR g:Place RETURN g.uri AS uri"
+ALL_MONTHS_QUERY = (
+    "MATCH (i:Invoice) WHERE i.ano IS NOT NULL AND i.mes IS NOT NULL "
+    "RETURN DISTINCT i.ano AS ano, i.mes AS mes"
+)
+
+
+def month_id(ano, mes):
+    return f"{int(ano):04d}-{int(mes):02d}"
+
+
+class AggregateTracker:
+    """
+    Acompanha, pelas triplas inseridas ou removidas numa carga incremental, quais agregados
+    precisam ser recalculados: deputados (totais de despesas), grupos (partidos/UFs) e meses.
+
+    O deputado e o mês de uma despesa vêm das próprias triplas (customer, ano e mês); só as
+    despesas alteradas sem essas triplas no delta (ex.: apenas o valor mudou) são consultadas no banco.
+    """
+
+    def __init__(self):
+        self.persons = set()
+        self.groups = set()
+        self.months = set()
+        self._changed = set()
+        self._customers = set()
+        self._dates = defaultdict(lambda: {POL.ano: set(), POL.mes: set()})
+
+    def __bool__(self):
+        return bool(self.persons or self.groups or self.months or self._changed or self._dates)
+
+    def collect(self, triples):
+        for s, p, o in triples:
+            if p in GROUP_PREDICATES:
+                self.groups.add(str(o))
+            elif p == RDF.type:
+                if o == SCHEMA.Person:
+                    self.persons.add(str(s))
+                elif o in GROUP_TYPES:
+                    self.groups.add(str(s))
+                elif o == SCHEMA.Invoice:
+                    self._changed.add(str(s))
+            elif p == SCHEMA.customer:
+                self._customers.add(str(s))
+                self.persons.add(str(o))
+            elif p == SCHEMA.totalPaymentDue:
+                self._changed.add(str(s))
+            elif p in (POL.ano, POL.mes):
+                # Para despesas removidas, o mês só é conhecido pelas triplas apagadas
+                self._dates[str(s)][p].add(int(o.toPython()))
+
+    @property
+    def invoices(self):
+        """
+        Despesas cujo deputado ou mês não aparece nas triplas coletadas (lidos do banco).
+        """
+        undated = {uri for uri, dates in self._dates.items() if not (dates[POL.ano] and dates[POL.mes])}
+        missing = {uri for uri in self._changed if uri not in self._customers or uri not in self._dates}
+        return undated | missing
+
+    def invoice_months(self, uri=None, ano=None, mes=None):
+        """
+        Meses afetados: todas as combinações de ano e mês vistas nas triplas da despesa `uri`
+        (mais o ano/mês atuais lidos do banco), ou de todas as despesas se `uri` for None.
+        """
+        if uri is None:
+            return {(a, m) for dates in self._dates.values() for a in dates[POL.ano] for m in dates[POL.mes]}
+        dates = self._dates.get(uri, {POL.ano: set(), POL.mes: set()})
+        anos = dates[POL.ano] | ({int(ano)} if ano is not None else set())
+        meses = dates[POL.mes] | ({int(mes)} if mes is not None else set())
+        return {(a, m) for a in anos for m in meses}
+
+
+def _batches(items, batch_size):
+    items = list(items)
+    for i in range(0, len(items), batch_size):
+        yield items[i:i + batch_size]
+
+def _read(session, query, uris, batch_size):
+    for batch in _batches(uris, batch_size):
+        yield from session.run(query, rows=[{"uri": uri} for uri in batch])
+
+def _write(session, query, rows, batch_size):
+    for batch in _batches(rows, batch_size):
+        session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+
+def refresh_aggregates(tracker, database=NEO4J_DATABASE, driver=None, batch_size=NEO4J_BATCH_SIZE):
+    """
+    Recalcula no Neo4j apenas os agregados afetados pela carga:
+    - Person.total_despesas / num_despesas (soma das despesas do deputado);
+    - Organization/Place.total_deputados / total_despesas (partidos e UFs);
+    - nós (:DespesaMensal {id: "AAAA-MM"}) com total e número de despesas do mês.
+    Retorna as estatísticas (quantidades recalculadas e segundos). A versão do grafo não é
+    incrementada aqui: a carga faz isso uma única vez, depois dos agregados.
+    """
+    if not tracker:
+        return {"deputados": 0, "grupos": 0, "meses": 0, "segundos": 0.0}
+
+    start = time.monotonic()
+    persons, groups = set(tracker.persons), set(tracker.groups)
+    months = tracker.months | tracker.invoice_months()
+
+    with get_session(database, driver) as session:
+        for query in SCHEMA_QUERIES:
+            session.run(query).consume()
+
+        for record in _read(session, INVOICE_CONTEXT_QUERY, tracker.invoices, batch_size):
+            if record["deputado"]:
+                persons.add(record["deputado"])
+            months.update(tracker.invoice_months(record["uri"], record["ano"], record["mes"]))
+
+        # Os totais dos grupos somam os dos deputados: deputados primeiro
+        _write(session, REFRESH_PERSONS_QUERY, [{"uri": uri} for uri in persons], batch_size)
+        groups.update(record["uri"] for record in _read(session, PERSON_GROUPS_QUERY, persons, batch_size))
+        _write(session, REFRESH_GROUPS_QUERY, [{"uri": uri} for uri in groups], batch_size)
+        _write(session, REFRESH_MONTHS_QUERY, [
+            {"id": month_id(ano, mes), "ano": ano, "mes": mes} for ano, mes in sorted(months)
+        ], batch_size)
+        session.run(DELETE_EMPTY_MONTHS_QUERY).consume()
+
+    stats = {
+        "deputados": len(persons),
+        "grupos": len(groups),
+        "meses": len(months),
+        "segundos": time.monotonic() - start,
+    }
+    print(f"[INFO] Agregados atualizados em {stats['segundos']:.1f}s: {stats['deputados']} deputados, "
+          f"{stats['grupos']} partidos/UFs e {stats['meses']} meses.")
+    return stats
+
+def rebuild_aggregates(database=NEO4J_DATABASE, driver=None, batch_size=NEO4J_BATCH_SIZE):
+    """
+    Recalcula todos os agregados (por exemplo, depois de uma importação com neo4j-admin).
+    """
+    tracker = AggregateTracker()
+    with get_session(database, driver) as session:
+        tracker.persons.update(record["uri"] for record in session.run(ALL_PERSONS_QUERY))
+        tracker.groups.update(record["uri"] for record in session.run(ALL_GROUPS_QUERY))
+        tracker.months.update((int(r["ano"]), int(r["mes"])) for r in session.run(ALL_MONTHS_QUERY))
+    return refresh_aggregates(tracker, database, driver, batch_size)
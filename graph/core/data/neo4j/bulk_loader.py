@@ -0,0 +1,296 @@
+import os
+import time
+from decimal import Decimal
+from functools import lru_cache
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from rdflib import Literal, RDF
+from rdflib_neo4j.utils import getLocalPart
+from graph.config import NEO4J_DATABASE, NEO4J_BATCH_SIZE, NEO4J_WRITE_WORKERS
+from graph.core.data.neo4j.driver import get_driver, get_session
+from graph.core.data.neo4j.query_cache import bump_graph_version
+from graph.core.data.neo4j.aggregates import AGGREGATE_PROPERTIES, AggregateTracker, refresh_aggregates, rebuild_aggregates
+from graph.core.data.rdf.nt_writer import iter_nt_file, from_nt_term
+
+
+# Mesmo nome da restrição criada pelo rdflib-neo4j, para que as duas cargas convivam
+CONSTRAINT_QUERY = "CREATE CONSTRAINT n10s_unique_uri IF NOT EXISTS FOR (r:Resource) REQUIRE r.uri IS UNIQUE"
+
+# Quantidade de triplas agrupadas em memória antes de enviar os lotes
+DEFAULT_CHUNK_SIZE = 200_000
+
+
+def map_name(uri):
+    """
+    Nome de rótulo/propriedade/relação de uma URI, como na estratégia MAP do rdflib-neo4j
+    (sem mapeamentos customizados: apenas a parte local da URI).
+    """
+    return getLocalPart(str(uri))
+
+def literal_value(literal):
+    """
+    Valor Python de um literal aceito pelo driver do Neo4j (Decimal vira float,
+    tipos desconhecidos viram texto), como faz o rdflib-neo4j.
+    """
+    value = literal.toPython()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Literal):
+        return str(value)
+    return value
+
+def node_query(labels):
+    q = "UNWIND $rows AS row MERGE (n:Resource {uri: row.uri}) "
+    if labels:
+        q += "SET " + ", ".join(f"n:`{label}`" for label in labels) + " "
+    return q + "SET n += row.props"
+
+def relationship_query(rel_type):
+    return (
+        "UNWIND $rows AS row "
+        "MATCH (a:Resource {uri: row.from}) "
+        "MATCH (b:Resource {uri: row.to}) "
+        f"MERGE (a)-[:`{rel_type}`]->(b)"
+    )
+
+def remove_label_query(label):
+    return f"UNWIND $rows AS row MATCH (n:Resource {{uri: row.uri}}) REMOVE n:`{label}`"
+
+def remove_property_query(prop):
+    return f"UNWIND $rows AS row MATCH (n:Resource {{uri: row.uri}}) REMOVE n.`{prop}`"
+
+def delete_relationship_query(rel_type):
+    return (
+        "UNWIND $rows AS row "
+        f"MATCH (:Resource {{uri: row.from}})-[r:`{rel_type}`]->(:Resource {{uri: row.to}}) "
+        "DELETE r"
+    )
+
+# Remove os nós que ficaram apenas com o rótulo Resource e a propriedade uri, sem relações
+# (os agregados materializados não contam: não vêm de triplas)
+DELETE_ORPHANS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (n:Resource {uri: row.uri}) "
+    "WHERE size(labels(n)) = 1 "
+    f"AND all(k IN keys(n) WHERE k = 'uri' OR k IN {list(AGGREGATE_PROPERTIES)}) "
+    "AND NOT EXISTS { (n)--() } "
+    "DELETE n"
+)
+
+def group_triples(triples):
+    """
+    Agrupa as triplas no modelo do rdflib-neo4j (estratégia MAP):
+    rdf:type vira rótulo, literais viram propriedades e URIs viram relações.
+
+    Retorna (nodes, rels): `nodes` é {tupla de rótulos: [{"uri", "props"}]} e
+    `rels` é {tipo: [{"from", "to"}]}. Os nós de destino das relações também entram em `nodes`.
+    """
+    labels = defaultdict(set)
+    props = defaultdict(dict)
+    rels = defaultdict(set)
+
+    for s, p, o in triples:
+        subject = str(s)
+        if isinstance(o, Literal):
+            props[subject][map_name(p)] = literal_value(o)
+        elif p == RDF.type:
+            labels[subject].add(map_name(o))
+        else:
+            rels[map_name(p)].add((subject, str(o)))
+            labels.setdefault(str(o), set())
+        labels.setdefault(subject, set())
+
+    nodes = defaultdict(list)
+    for uri, node_labels in labels.items():
+        nodes[tuple(sorted(node_labels))].append({"uri": uri, "props": props.get(uri, {})})
+
+    rels = {rel_type: [{"from": a, "to": b} for a, b in pairs] for rel_type, pairs in rels.items()}
+    return nodes, rels
+
+def group_deletions(triples):
+    """
+    Agrupa triplas removidas pela operação inversa da carga: rótulos e propriedades
+    a remover por nome, relações a apagar por tipo e os nós afetados.
+    Retorna (labels, props, rels, touched).
+    """
+    labels = defaultdict(list)
+    props = defaultdict(list)
+    rels = defaultdict(list)
+    touched = set()
+
+    for s, p, o in triples:
+        subject = str(s)
+        touched.add(subject)
+        if isinstance(o, Literal):
+            props[map_name(p)].append({"uri": subject})
+        elif p == RDF.type:
+            labels[map_name(o)].append({"uri": subject})
+        else:
+            rels[map_name(p)].append({"from": subject, "to": str(o)})
+            touched.add(str(o))
+
+    return labels, props, rels, [{"uri": uri} for uri in touched]
+
+def _batches(rows, batch_size):
+    for i in range(0, len(rows), batch_size):
+        yield rows[i:i + batch_size]
+
+class Neo4jBulkLoader:
+    """
+    Carga em massa de triplas RDF no Neo4j com transações `UNWIND ... MERGE` parametrizadas.
+
+    As triplas são agrupadas em lotes de nós (por conjunto de rótulos) e de relações
+    (por tipo) e escritos por `workers` sessões em paralelo. Os nós de cada bloco são gravados
+    antes das relações, que então usam MATCH pelos índices da restrição de unicidade em `uri`.
+    O modelo resultante é o mesmo do rdflib-neo4j com HANDLE_VOCAB_URI_STRATEGY.MAP.
+
+    Com `track_aggregates=False` (cargas completas), as triplas não são acompanhadas e
+    `refresh_aggregates` recalcula todos os agregados.
+    """
+
+    def __init__(self, driver=None, database=NEO4J_DATABASE, batch_size=NEO4J_BATCH_SIZE,
+                 workers=NEO4J_WRITE_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE, track_aggregates=True):
+        self.driver = driver or get_driver()
+        self.database = database
+        self.batch_size = batch_size
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.stats = {"triplas": 0, "nos": 0, "relacoes": 0, "removidas": 0, "lotes": 0, "segundos": 0.0}
+        self.aggregates = AggregateTracker() if track_aggregates else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # O driver é compartilhado (ver driver.get_driver) e continua aberto
+        return False
+
+    def ensure_constraints(self):
+        """
+        Cria a restrição de unicidade em :Resource(uri) (e o índice que ela mantém) antes da carga.
+        """
+        with get_session(self.database, self.driver) as session:
+            session.run(CONSTRAINT_QUERY).consume()
+
+    def _write(self, query, rows):
+        with get_session(self.database, self.driver) as session:
+            # execute_write repete a transação em erros transitórios (ex.: deadlock entre sessões)
+            session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+        return len(rows)
+
+    def _run_parallel(self, executor, jobs):
+        futures = [executor.submit(self._write, query, rows) for query, rows in jobs]
+        for future in futures:
+            future.result()
+        self.stats["lotes"] += len(futures)
+
+    def write_chunk(self, executor, triples):
+        if self.aggregates is not None:
+            self.aggregates.collect(triples)
+        nodes, rels = group_triples(triples)
+        self._run_parallel(executor, [
+            (node_query(labels), batch)
+            for labels, rows in nodes.items() for batch in _batches(rows, self.batch_size)
+        ])
+        self._run_parallel(executor, [
+            (relationship_query(rel_type), batch)
+            for rel_type, rows in rels.items() for batch in _batches(rows, self.batch_size)
+        ])
+        self.stats["triplas"] += len(triples)
+        self.stats["nos"] += sum(len(rows) for rows in nodes.values())
+        self.stats["relacoes"] += sum(len(rows) for rows in rels.values())
+
+    def delete_chunk(self, executor, triples):
+        if self.aggregates is not None:
+            self.aggregates.collect(triples)
+        labels, props, rels, touched = group_deletions(triples)
+        jobs = [(remove_label_query(label), rows) for label, rows in labels.items()]
+        jobs += [(remove_property_query(prop), rows) for prop, rows in props.items()]
+        jobs += [(delete_relationship_query(rel_type), rows) for rel_type, rows in rels.items()]
+        self._run_parallel(executor, [(q, batch) for q, rows in jobs for batch in _batches(rows, self.batch_size)])
+        self._run_parallel(executor, [(DELETE_ORPHANS_QUERY, batch) for batch in _batches(touched, self.batch_size)])
+        self.stats["removidas"] += len(triples)
+
+    def _run_chunks(self, triples, write):
+        self.ensure_constraints()
+        start = time.monotonic()
+        before = self.stats["triplas"] + self.stats["removidas"]
+        chunk = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for triple in triples:
+                chunk.append(triple)
+                if len(chunk) >= self.chunk_size:
+                    write(executor, chunk)
+                    chunk = []
+                    self._report(start, before)
+            if chunk:
+                write(executor, chunk)
+
+        self.stats["segundos"] += time.monotonic() - start
+        self._report(start, before, final=True)
+        return self.stats
+
+    def load(self, triples):
+        """
+        Carrega um iterável de triplas rdflib (rdflib.Graph, TripleStore ou gerador),
+        bloco a bloco, e retorna as estatísticas da carga.
+        """
+        return self._run_chunks(triples, self.write_chunk)
+
+    def delete(self, triples):
+        """
+        Desfaz no Neo4j um iterável de triplas (remove rótulos, propriedades e relações)
+        e apaga os nós que ficarem vazios. Usado pela carga incremental.
+        """
+        return self._run_chunks(triples, self.delete_chunk)
+
+    def refresh_aggregates(self):
+        """
+        Recalcula os agregados materializados afetados pelas triplas carregadas/removidas
+        até aqui (ver aggregates.refresh_aggregates), ou todos eles se as triplas não foram
+        acompanhadas. Chamado ao final de cada carga: só então a versão do grafo é incrementada,
+        uma única vez, invalidando os resultados em cache calculados sobre o grafo anterior.
+        """
+        if self.aggregates is None:
+            self.stats["agregados"] = rebuild_aggregates(self.database, self.driver, self.batch_size)
+        else:
+            self.stats["agregados"] = refresh_aggregates(self.aggregates, self.database, self.driver, self.batch_size)
+            self.aggregates = AggregateTracker()
+        self.stats["versao"] = bump_graph_version(self.database, self.driver)
+        return self.stats["agregados"]
+
+    def _report(self, start, before=0, final=False):
+        elapsed = max(time.monotonic() - start, 1e-9)
+        prefix = "Carga concluída" if final else "Carga em andamento"
+        total = self.stats["triplas"] + self.stats["removidas"] - before
+        print(f"[INFO] {prefix}: {self.stats['triplas']} triplas inseridas e {self.stats['removidas']} removidas "
+              f"({total / elapsed:.0f} triplas/s), {self.stats['nos']} nós e {self.stats['relacoes']} relações "
+              f"em {self.stats['lotes']} lotes.")
+
+def iter_nt_triples(nt_paths):
+    """
+    Lê um ou mais arquivos N-Triples (.nt ou .nt.gz) como triplas de termos rdflib.
+    """
+    if isinstance(nt_paths, (str, os.PathLike)):
+        nt_paths = [nt_paths]
+    parse = lru_cache(maxsize=100_000)(from_nt_term)
+    for path in nt_paths:
+        for s, p, o in iter_nt_file(path):
+            yield parse(s), parse(p), from_nt_term(o)
+
+def bulk_load(triples, **kwargs):
+    """
+    Atalho: carrega as triplas com um Neo4jBulkLoader e retorna as estatísticas.
+    Como a carga é completa, os agregados são todos recalculados ao final.
+    """
+    kwargs.setdefault("track_aggregates", False)
+    with Neo4jBulkLoader(**kwargs) as loader:
+        loader.load(triples)
+        loader.refresh_aggregates()
+        return loader.stats
+
+def bulk_load_nt(nt_paths, **kwargs):
+    """
+    Carrega arquivos N-Triples no Neo4j sem montar um rdflib.Graph.
+    """
+    return bulk_load(iter_nt_triples(nt_paths), **kwargs)
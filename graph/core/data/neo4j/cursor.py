@@ -0,0 +1,104 @@
+import pandas as pd
+from graph.config import NEO4J_DATABASE, NEO4J_FETCH_SIZE, CYPHER_PAGE_ROWS, CYPHER_PAGE_BYTES
+from graph.core.data.neo4j.driver import get_driver
+
+
+# Registros convertidos em colunas tipadas por bloco
+CHUNK_ROWS = 1000
+
+
+def _chunk_frame(columns, keys):
+    """
+    Converte um bloco de valores (uma lista por coluna) em DataFrame com tipos inferidos
+    por coluna (inteiros, reais, textos...), em vez de uma lista de dicionários por linha.
+    """
+    return pd.DataFrame({key: pd.Series(columns[key]).infer_objects() for key in keys}, columns=keys)
+
+class CypherCursor:
+    """
+    Resultado de uma consulta Cypher lido sob demanda, em páginas.
+
+    A consulta roda uma única vez: os registros chegam do servidor em lotes de `fetch_size`
+    e cada chamada a `fetch_page` continua de onde a anterior parou, montando o DataFrame
+    bloco a bloco até o limite de linhas (`page_rows`) ou de memória (`max_bytes`) da página.
+    O cursor mantém a sessão aberta até ser esgotado ou fechado (`close`).
+    """
+
+    def __init__(self, cypher_query, parameters=None, database=NEO4J_DATABASE, fetch_size=NEO4J_FETCH_SIZE,
+                 page_rows=CYPHER_PAGE_ROWS, max_bytes=CYPHER_PAGE_BYTES, driver=None):
+        self.cypher_query = cypher_query
+        self.page_rows = page_rows
+        self.max_bytes = max_bytes
+        self.rows_read = 0
+        self.pages_read = 0
+        self._session = (driver or get_driver()).session(database=database, fetch_size=fetch_size)
+        try:
+            self._result = self._session.run(cypher_query, parameters or {})
+            self.keys = list(self._result.keys())
+        except Exception:
+            self._session.close()
+            raise
+        self.exhausted = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+            self.exhausted = True
+
+    def fetch_page(self):
+        """
+        Lê a próxima página. Retorna um dicionário com o DataFrame (`df`), a linha inicial,
+        se a página foi truncada (`truncated`) e por qual limite ("rows" ou "bytes"),
+        e se ainda há registros (`has_more`).
+        """
+        start_row = self.rows_read
+        frames, used_bytes, reason = [], 0, None
+        columns = {key: [] for key in self.keys}
+        rows = 0
+
+        if not self.exhausted:
+            for record in self._result:
+                data = record.data()
+                for key in self.keys:
+                    columns[key].append(data.get(key))
+                rows += 1
+
+                if rows % CHUNK_ROWS == 0:
+                    frames.append(_chunk_frame(columns, self.keys))
+                    used_bytes += int(frames[-1].memory_usage(deep=True).sum())
+                    columns = {key: [] for key in self.keys}
+                    if used_bytes >= self.max_bytes:
+                        reason = "bytes"
+                        break
+                if rows >= self.page_rows:
+                    reason = "rows"
+                    break
+
+        if any(columns[key] for key in self.keys):
+            frames.append(_chunk_frame(columns, self.keys))
+            used_bytes += int(frames[-1].memory_usage(deep=True).sum())
+
+        self.rows_read += rows
+        self.pages_read += 1
+        has_more = not self.exhausted and self._result.peek() is not None
+        if not has_more:
+            self.close()
+
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=self.keys)
+        df.index = pd.RangeIndex(start_row, start_row + len(df))
+        return {
+            "df": df,
+            "start_row": start_row,
+            "page": self.pages_read,
+            "bytes": used_bytes,
+            "truncated": has_more,
+            "reason": reason if has_more else None,
+            "has_more": has_more,
+        }
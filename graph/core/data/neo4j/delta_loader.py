@@ -0,0 +1,149 @@
+import os
+import time
+from itertools import chain
+from graph.config import PROCESSED_DATA, NEO4J_BATCH_SIZE, NEO4J_WRITE_WORKERS
+from graph.core.data.io_utils import load_json, save_json
+from graph.core.data.rdf.nt_diff import sort_nt_snapshot, diff_sorted_snapshots, parse_triple
+from graph.core.data.rdf.nt_writer import open_nt_input, parse_nt_line
+from graph.core.data.neo4j.bulk_loader import Neo4jBulkLoader
+
+
+# Snapshots já carregados no Neo4j e seus fingerprints
+STATE_DIR = os.path.join(PROCESSED_DATA, "neo4j_state")
+
+
+def _state_paths(name, state_dir):
+    return (
+        os.path.join(state_dir, f"{name}.loaded.nt"),
+        os.path.join(state_dir, f"{name}.loaded.json"),
+    )
+
+def load_state(name, state_dir=STATE_DIR):
+    """
+    Estado da última carga do snapshot `name`: fingerprint, número de triplas e data (ou None).
+    """
+    return load_json(_state_paths(name, state_dir)[1])
+
+def _literal_key(line):
+    """
+    Par (sujeito, predicado) de uma linha N-Triples cujo objeto é literal (None se for URI).
+    """
+    subject, predicate, obj = parse_nt_line(line)
+    return (subject, predicate) if obj.startswith('"') else None
+
+def _split_delta(old_path, new_path, tmp_path):
+    """
+    Grava o delta em dois arquivos temporários (inserções e remoções), para que as remoções
+    sejam aplicadas antes das inserções sem manter o delta em memória.
+    Retorna as contagens e os pares (sujeito, predicado) de literais removidos.
+    """
+    inserts, deletes = 0, 0
+    removed_literals = set()
+    with open(tmp_path + ".ins", "w", encoding="utf-8", newline="") as ins, \
+            open(tmp_path + ".del", "w", encoding="utf-8", newline="") as dels:
+        for op, line in diff_sorted_snapshots(old_path, new_path):
+            if op == "+":
+                ins.write(line)
+                inserts += 1
+            else:
+                dels.write(line)
+                deletes += 1
+                key = _literal_key(line)
+                if key:
+                    removed_literals.add(key)
+    return inserts, deletes, removed_literals
+
+def _write_restores(new_path, removed_literals, out_path):
+    """
+    No modelo MAP cada par (sujeito, predicado) literal é uma única propriedade, e remover
+    uma tripla apaga a propriedade inteira. Grava as triplas do novo snapshot desses pares
+    (ex.: o outro nome de um deputado), para regravar as propriedades depois das remoções.
+    """
+    restores = 0
+    with open_nt_input(new_path) as f, open(out_path, "w", encoding="utf-8", newline="") as out:
+        if removed_literals:
+            for line in f:
+                if _literal_key(line) in removed_literals:
+                    out.write(line)
+                    restores += 1
+    return restores
+
+def _iter_triples(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for line in f:
+            yield parse_triple(line)
+
+def _save_state(nt_paths, name, sorted_path, triples, fingerprint, state_dir):
+    """
+    Torna o snapshot ordenado `sorted_path` a referência da próxima carga incremental.
+    """
+    loaded_path, state_path = _state_paths(name, state_dir)
+    os.replace(sorted_path, loaded_path)
+    state = {
+        "fingerprint": fingerprint,
+        "triplas": triples,
+        "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sources": [os.path.basename(str(p)) for p in ([nt_paths] if isinstance(nt_paths, (str, os.PathLike)) else nt_paths)],
+    }
+    save_json(state, state_path)
+
+def record_snapshot(nt_paths, name, state_dir=STATE_DIR):
+    """
+    Registra o snapshot como já carregado no Neo4j, sem enviar triplas (ex.: depois de uma
+    importação com neo4j-admin), para que a próxima carga incremental envie apenas o que mudar.
+    Retorna o fingerprint.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    new_path = os.path.join(state_dir, f"{name}.new.nt")
+    triples, fingerprint = sort_nt_snapshot(nt_paths, new_path, tmp_dir=state_dir)
+    _save_state(nt_paths, name, new_path, triples, fingerprint, state_dir)
+    print(f"[INFO] Snapshot '{name}' registrado como carregado ({triples} triplas, {fingerprint[:12]}).")
+    return fingerprint
+
+def load_delta(nt_paths, name, state_dir=STATE_DIR, batch_size=NEO4J_BATCH_SIZE, workers=NEO4J_WRITE_WORKERS,
+               driver=None, force=False):
+    """
+    Carga incremental: compara o novo snapshot N-Triples com o último carregado no Neo4j
+    (ordenação externa + intercalação, sem limite de memória) e aplica apenas as triplas
+    removidas e inseridas. Ao final, o snapshot ordenado e seu fingerprint passam a ser
+    a referência da próxima carga. Se o fingerprint não mudou, nada é enviado ao banco.
+
+    Retorna as estatísticas da carga (inseridas, removidas, fingerprint, segundos).
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    loaded_path, state_path = _state_paths(name, state_dir)
+    new_path = os.path.join(state_dir, f"{name}.new.nt")
+    start = time.monotonic()
+
+    triples, fingerprint = sort_nt_snapshot(nt_paths, new_path, tmp_dir=state_dir)
+    state = load_json(state_path) or {}
+    if not force and state.get("fingerprint") == fingerprint and os.path.exists(loaded_path):
+        os.remove(new_path)
+        print(f"[INFO] Snapshot '{name}' inalterado ({fingerprint[:12]}); nada a carregar.")
+        return {"inseridas": 0, "removidas": 0, "fingerprint": fingerprint, "segundos": time.monotonic() - start}
+
+    old_path = None if force else loaded_path
+    inserts, deletes, removed_literals = _split_delta(old_path, new_path, new_path)
+    restores = _write_restores(new_path, removed_literals, new_path + ".set")
+    print(f"[INFO] Delta de '{name}': {inserts} triplas inseridas e {deletes} removidas de {triples} "
+          f"({restores} valores literais regravados).")
+
+    try:
+        # Sem snapshot anterior tudo é inserção: os agregados são recalculados por completo
+        with Neo4jBulkLoader(driver=driver, batch_size=batch_size, workers=workers,
+                             track_aggregates=old_path is not None and os.path.exists(old_path)) as loader:
+            if deletes:
+                loader.delete(_iter_triples(new_path + ".del"))
+            if inserts or restores:
+                loader.load(chain(_iter_triples(new_path + ".set"), _iter_triples(new_path + ".ins")))
+            # Apenas partidos, UFs, deputados e meses tocados pelo delta (todos, na primeira carga)
+            loader.refresh_aggregates()
+    finally:
+        for suffix in (".ins", ".del", ".set"):
+            os.remove(new_path + suffix)
+
+    _save_state(nt_paths, name, new_path, triples, fingerprint, state_dir)
+
+    stats = {"inseridas": inserts, "removidas": deletes, "regravadas": restores, "fingerprint": fingerprint, "segundos": time.monotonic() - start}
+    print(f"[INFO] Carga incremental de '{name}' concluída em {stats['segundos']:.1f}s.")
+    return stats
@@ -0,0 +1,47 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from neo4j import GraphDatabase
+from graph.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+
+
+# Um driver por (uri, usuário) no processo; o driver mantém o pool de conexões
+_drivers = {}
+_drivers_lock = threading.Lock()
+
+
+def get_driver(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD):
+    """
+    Retorna o driver Neo4j compartilhado do processo, criado na primeira chamada.
+    Como o módulo fica importado entre as reexecuções do Streamlit, o mesmo pool de
+    conexões é reaproveitado a cada interação.
+    """
+    key = (uri, user)
+    with _drivers_lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            driver = GraphDatabase.driver(uri, auth=(user, password))
+            _drivers[key] = driver
+        return driver
+
+@contextmanager
+def get_session(database=NEO4J_DATABASE, driver=None, **kwargs):
+    """
+    Sessão do pool do driver compartilhado (as conexões voltam ao pool ao final).
+    """
+    session = (driver or get_driver()).session(database=database, **kwargs)
+    try:
+        yield session
+    finally:
+        session.close()
+
+def close_drivers():
+    """
+    Fecha os drivers compartilhados (chamado automaticamente ao encerrar o processo).
+    """
+    with _drivers_lock:
+        for driver in _drivers.values():
+            driver.close()
+        _drivers.clear()
+
+atexit.register(close_drivers)
@@ -0,0 +1,108 @@
+import math
+from collections import defaultdict, Counter
+import networkx as nx
+from pyvis.network import Network
+from graph.config import GRAPH_NODE_BUDGET, GRAPH_PHYSICS_MAX_NODES
+
+
+CLUSTER_COLOR = "#d9d9d9"
+OTHERS_CLUSTER = "Outros"
+CLUSTER_PREFIX = "cluster:"
+
+
+def records_to_edges(records):
+    """
+    Arestas (source, target, rel) dos registros de uma consulta com colunas source, target e rel.
+    """
+    return [(str(r["source"]), str(r["target"]), str(r["rel"])) for r in records]
+
+def reduce_graph(edges, node_budget=GRAPH_NODE_BUDGET):
+    """
+    Nível de detalhe: se o grafo tiver mais nós que `node_budget`, mantém os nós de maior grau
+    (partidos, UFs...) e agrupa os demais em um nó de cluster por vizinho mantido de maior grau
+    (ex.: os deputados de um partido), somando as arestas paralelas.
+
+    Retorna (nodes, edges): `nodes` é {id: {"label", "degree", "members"}} (members > 0 em clusters)
+    e `edges` é {(u, v, rel): quantidade}.
+    """
+    degree = Counter()
+    for source, target, _ in edges:
+        degree[source] += 1
+        degree[target] += 1
+
+    if len(degree) <= node_budget:
+        nodes = {n: {"label": n, "degree": d, "members": 0} for n, d in degree.items()}
+        return nodes, Counter(edges)
+
+    # Reserva metade do orçamento para os nós de cluster (no máximo um por nó mantido).
+    # Nós empatados no grau de corte saem juntos, para não manter uma amostra arbitrária deles.
+    ranked = sorted(degree.items(), key=lambda item: (-item[1], item[0]))
+    limit = max(1, node_budget // 2)
+    cutoff = ranked[limit][1]
+    kept = {n for n, d in ranked[:limit] if d > cutoff} or {n for n, _ in ranked[:limit]}
+
+    neighbors = defaultdict(set)
+    for source, target, _ in edges:
+        neighbors[source].add(target)
+        neighbors[target].add(source)
+
+    cluster_of = {}
+    for node in degree:
+        if node in kept:
+            continue
+        hubs = [n for n in neighbors[node] if n in kept]
+        hub = max(hubs, key=lambda n: (degree[n], n)) if hubs else None
+        cluster_of[node] = f"{CLUSTER_PREFIX}{hub}" if hub else OTHERS_CLUSTER
+
+    members = Counter(cluster_of.values())
+    nodes = {n: {"label": n, "degree": degree[n], "members": 0} for n in kept}
+    for cluster, count in members.items():
+        hub = cluster[len(CLUSTER_PREFIX):] if cluster.startswith(CLUSTER_PREFIX) else cluster
+        nodes[cluster] = {"label": f"{count} nós ({hub})", "degree": count, "members": count}
+
+    reduced = Counter()
+    for source, target, rel in edges:
+        u, v = cluster_of.get(source, source), cluster_of.get(target, target)
+        if u != v:
+            reduced[(u, v, rel)] += 1
+    return nodes, reduced
+
+def render_pyvis_html(records, node_budget=GRAPH_NODE_BUDGET, physics_max_nodes=GRAPH_PHYSICS_MAX_NODES,
+                      height="600px"):
+    """
+    Gera em memória o HTML pyvis do grafo dos registros (source, target, rel), com nível de detalhe:
+    acima de `node_budget` nós, os nós de menor grau são agrupados (ver reduce_graph); acima de
+    `physics_max_nodes`, a simulação física é desligada e as posições vêm de um layout pré-calculado.
+    Nós com mais conexões têm tamanho maior e cores diferentes.
+    """
+    nodes, edges = reduce_graph(records_to_edges(records), node_budget)
+    net = Network(height=height, width="100%", bgcolor="#ffffff", font_color="black")
+
+    positions = {}
+    if len(nodes) > physics_max_nodes:
+        g = nx.Graph()
+        g.add_nodes_from(nodes)
+        g.add_edges_from((u, v) for u, v, _ in edges)
+        positions = nx.spring_layout(g, seed=42, iterations=50, scale=max(500, 15 * math.sqrt(len(nodes)) * 20))
+        net.toggle_physics(False)
+
+    for node, info in nodes.items():
+        if info["members"]:
+            size = 10 + 4 * math.log2(1 + info["members"])
+            color = CLUSTER_COLOR
+            title = f"Agrupamento de {info['members']} nós"
+        else:
+            size = min(60, 10 + info["degree"] * 2)  # aumenta tamanho conforme grau
+            color = "#ff9999" if info["degree"] > 5 else "#99ccff"  # cor diferente se for "mais relevante"
+            title = f"{node} (grau {info['degree']})"
+        kwargs = {}
+        if node in positions:
+            x, y = positions[node]
+            kwargs = {"x": float(x), "y": float(y)}
+        net.add_node(node, label=info["label"], size=size, color=color, title=title, **kwargs)
+
+    for (source, target, rel), count in edges.items():
+        label = rel if count == 1 else f"{rel} ×{count}"
+        net.add_edge(source, target, label=label, width=1 + math.log2(count))
+
+    return net.generate_html()
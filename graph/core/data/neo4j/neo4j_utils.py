@@ -1,10 +1,10 @@
-from rdflib import Graph
 from rdflib_neo4j import Neo4jStore, Neo4jStoreConfig, HANDLE_VOCAB_URI_STRATEGY
-from graph.config import NEO4J_DATABASE, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
-from neo4j import GraphDatabase
-from pyvis.network import Network
-import tempfile
-from collections import defaultdict
+from graph.config import NEO4J_DATABASE, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_BATCH_SIZE, NEO4J_WRITE_WORKERS, GRAPH_NODE_BUDGET
+from graph.core.data.neo4j.bulk_loader import bulk_load
+from graph.core.data.neo4j.driver import get_session
+from graph.core.data.neo4j.query_cache import query_cache
+from graph.core.data.neo4j.graph_render import render_pyvis_html
+import streamlit as st
 
 
 def connect_neo4j(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD, database=NEO4J_DATABASE):
@@ -18,82 +18,42 @@ def connect_neo4j(uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD, datab
     )
     return Neo4jStore(config=config)
 
-def save_graph_to_neo4j(original_graph):
+def save_graph_to_neo4j(original_graph, batch_size=NEO4J_BATCH_SIZE, workers=NEO4J_WRITE_WORKERS):
     """
-    Salva o grafo RDF diretamente no Neo4j usando rdflib-neo4j.
-    """    
-
-    store = connect_neo4j()
-    g = Graph(store=store)
-    g += original_graph
-    g.commit()
-    g.close()
+    Salva o grafo RDF (rdflib.Graph ou TripleStore) no Neo4j com a carga em massa
+    (lotes UNWIND em sessões paralelas), no mesmo modelo do rdflib-neo4j.
+    """
+    stats = bulk_load(original_graph, batch_size=batch_size, workers=workers)
     print("[INFO] Grafo RDF salvo com sucesso no Neo4j!")
+    return stats
 
-def data_rdf_graph_neo4j(ciphertext, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD):
+def run_cypher(cypher_query, parameters=None, database=NEO4J_DATABASE):
     """
-    Executa uma consulta Cypher no Neo4j e retorna os resultados.
+    Executa uma consulta Cypher (uma única vez) com uma sessão do driver compartilhado
+    e retorna os registros como lista de dicionários.
     """
-    driver = GraphDatabase.driver(uri, auth=(user, password))
-    results = []
-    with driver.session() as session:
-        cypher_query = ciphertext
-        records = session.run(cypher_query)
-        for record in records:
-            results.append(record.data())
-    driver.close()
-    return results    
+    with get_session(database) as session:
+        return [record.data() for record in session.run(cypher_query, parameters or {})]
 
-from pyvis.network import Network
-import tempfile
-import streamlit as st
-import os
-from neo4j import GraphDatabase
-
-def draw_neo4j_graph(cypher_query, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD):
+def data_rdf_graph_neo4j(ciphertext, parameters=None, use_cache=True):
     """
-    Executa uma consulta Cypher no Neo4j e exibe o grafo no Streamlit usando pyvis.
-    Espera que a query retorne: source, target, rel (tipo da relação).
-    Nós com mais conexões terão tamanho maior e cores diferentes.
+    Executa uma consulta Cypher no Neo4j e retorna os resultados.
+    Com `use_cache=True`, consultas de leitura repetidas são servidas do cache
+    até a próxima carga (ver query_cache).
     """
-    driver = GraphDatabase.driver(uri, auth=(user, password))
-    net = Network(height="600px", width="100%", bgcolor="#ffffff", font_color="black")
-    
-    # Contadores de conexões por nó
-    node_degrees = defaultdict(int)
-    edges = []
+    if not use_cache:
+        return run_cypher(ciphertext, parameters)
+    return query_cache.run(ciphertext, lambda: run_cypher(ciphertext, parameters), parameters)
 
-    with driver.session() as session:
-        results = session.run(cypher_query)
-        for record in results:
-            source = str(record["source"])
-            target = str(record["target"])
-            rel = str(record["rel"])
-
-            # Contabiliza grau
-            node_degrees[source] += 1
-            node_degrees[target] += 1
-            edges.append((source, target, rel))
-
-    # Define estilos baseados no grau
-    for node, degree in node_degrees.items():
-        size = 10 + degree * 2  # aumenta tamanho conforme grau
-        color = "#ff9999" if degree > 5 else "#99ccff"  # cor diferente se for "mais relevante"
-        net.add_node(node, label=node, size=size, color=color)
-
-    # Adiciona arestas
-    for source, target, rel in edges:
-        net.add_edge(source, target, label=rel)
-
-    driver.close()
-
-    # Salvar grafo como HTML temporário
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp_file:
-        net.save_graph(tmp_file.name)
-        tmp_path = tmp_file.name
+def draw_neo4j_graph(cypher_query=None, records=None, node_budget=GRAPH_NODE_BUDGET):
+    """
+    Exibe no Streamlit, usando pyvis, o grafo dos registros de uma consulta Cypher.
+    Espera registros com: source, target, rel (tipo da relação). Se `records` já vier
+    da consulta exibida na tabela, a consulta não é executada de novo.
+    Grafos maiores que `node_budget` nós são resumidos (ver graph_render.reduce_graph).
+    """
+    if records is None:
+        records = run_cypher(cypher_query)
 
-    # Exibir no Streamlit
-    with open(tmp_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+    html_content = render_pyvis_html(records, node_budget=node_budget)
     st.components.v1.html(html_content, height=650)
-    os.remove(tmp_path)
\ No newline at end of file
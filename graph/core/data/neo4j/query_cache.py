@@ -0,0 +1,173 @@
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+from graph.config import NEO4J_DATABASE, CYPHER_CACHE_SIZE, CYPHER_CACHE_TTL, CYPHER_VERSION_TTL
+from graph.core.data.neo4j.driver import get_session
+
+
+# Nó marcador da versão do grafo, incrementado a cada carga. Tem um rótulo próprio (fora do
+# Resource do RDF) e nenhuma relação, então não aparece nas consultas por padrões do grafo
+VERSION_QUERY = "MATCH (v:_GraphMeta {id: 'version'}) RETURN v.version AS version"
+BUMP_VERSION_QUERY = (
+    "MERGE (v:_GraphMeta {id: 'version'}) "
+    "SET v.version = coalesce(v.version, 0) + 1, v.updated_at = datetime() "
+    "RETURN v.version AS version"
+)
+
+# Migração única: o marcador antigo (:GraphVersion) é removido quando o novo é criado
+DROP_LEGACY_VERSION_QUERY = "MATCH (v:GraphVersion) DELETE v"
+
+# Procedimentos somente leitura cujos resultados podem ir para o cache (os demais podem escrever)
+CACHEABLE_PROCEDURES = frozenset(name.lower() for name in (
+    "db.labels", "db.relationshipTypes", "db.propertyKeys",
+    "db.schema.visualization", "db.schema.nodeTypeProperties", "db.schema.relTypeProperties",
+))
+
+# Literais de texto/identificadores entre crases, comentários e espaços
+_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`|//[^\n]*|\s+')
+_WRITE_RE = re.compile(r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b", re.IGNORECASE)
+# CALL de procedimento (nome com pontos, possivelmente entre crases); "CALL {" é subconsulta
+_CALL_RE = re.compile(r"\bCALL\s+((?:`[^`]*`|\w+)(?:\s*\.\s*(?:`[^`]*`|\w+))*)", re.IGNORECASE)
+
+
+def normalize_query(cypher_query):
+    """
+    Forma canônica da consulta para a chave do cache: sem comentários e com espaços colapsados,
+    preservando o conteúdo de textos e nomes entre crases.
+    """
+    def replace(match):
+        token = match.group(0)
+        if token.startswith("//"):
+            return " "
+        if token[0] in "\"'`":
+            return token
+        return " "
+    # A segunda passada junta os espaços deixados no lugar dos comentários
+    return _TOKEN_RE.sub(replace, _TOKEN_RE.sub(replace, cypher_query)).strip()
+
+def _procedure_name(call):
+    return "".join(part.strip().strip("`") for part in re.split(r"(\.)", call)).lower()
+
+def is_read_only(normalized_query):
+    """
+    Consultas com cláusulas de escrita, ou que chamam procedimentos fora de CACHEABLE_PROCEDURES
+    (ex.: apoc.*, que podem escrever), não são guardadas no cache.
+    """
+    code = _TOKEN_RE.sub(lambda m: " " if m.group(0)[0] in "\"'/" else m.group(0), normalized_query)
+    if any(_procedure_name(call) not in CACHEABLE_PROCEDURES for call in _CALL_RE.findall(code)):
+        return False
+    return not _WRITE_RE.search(_TOKEN_RE.sub(lambda m: " " if m.group(0)[0] in "\"'`/" else m.group(0), normalized_query))
+
+def read_graph_version(database=NEO4J_DATABASE, driver=None):
+    """
+    Versão atual do grafo do banco (0 se ainda não houve carga).
+    """
+    with get_session(database, driver) as session:
+        record = session.run(VERSION_QUERY).single()
+    return record["version"] if record else 0
+
+def bump_graph_version(database=NEO4J_DATABASE, driver=None):
+    """
+    Incrementa o marcador de versão do grafo (chamado pelas cargas), invalidando os caches de consulta.
+    """
+    with get_session(database, driver) as session:
+        version = session.run(BUMP_VERSION_QUERY).single()["version"]
+        if version == 1:
+            session.run(DROP_LEGACY_VERSION_QUERY).consume()
+    query_cache.invalidate()
+    return version
+
+class QueryCache:
+    """
+    Cache LRU com TTL de resultados de consultas Cypher, por texto normalizado + parâmetros.
+
+    Cada entrada guarda a versão do grafo em que foi calculada (ver bump_graph_version); ao mudar
+    a versão, as entradas antigas deixam de ser servidas. A versão lida do banco fica em memória:
+    é relida a cada `version_ttl` segundos (cargas de outros processos ou máquinas) e descartada
+    pelas cargas deste processo.
+    """
+
+    def __init__(self, maxsize=CYPHER_CACHE_SIZE, ttl=CYPHER_CACHE_TTL, version_ttl=CYPHER_VERSION_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked = 0.0
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "stale": 0, "evictions": 0, "bypass": 0}
+
+    @staticmethod
+    def make_key(cypher_query, parameters=None, database=NEO4J_DATABASE):
+        return (database, normalize_query(cypher_query), json.dumps(parameters or {}, sort_keys=True, default=str))
+
+    def graph_version(self, database=NEO4J_DATABASE):
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked >= self.version_ttl:
+            self._version = read_graph_version(database)
+            self._version_checked = now
+        return self._version
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            records, expires, entry_version = entry
+            if entry_version != version or time.monotonic() >= expires:
+                self._stats["stale" if entry_version != version else "expired"] += 1
+                self._stats["misses"] += 1
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return records
+
+    def put(self, key, version, records):
+        with self._lock:
+            self._entries[key] = (records, time.monotonic() + self.ttl, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def run(self, cypher_query, execute, parameters=None, database=NEO4J_DATABASE):
+        """
+        Retorna os registros da consulta, do cache quando possível; `execute()` roda a consulta no banco.
+        Consultas de escrita não são guardadas e incrementam a versão do grafo.
+        """
+        key = self.make_key(cypher_query, parameters, database)
+        if not is_read_only(key[1]):
+            with self._lock:
+                self._stats["bypass"] += 1
+            records = execute()
+            bump_graph_version(database)
+            return records
+
+        version = self.graph_version(database)
+        records = self.get(key, version)
+        if records is None:
+            records = execute()
+            self.put(key, version, records)
+        return records
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(self._stats, size=len(self._entries),
+                        hit_rate=self._stats["hits"] / lookups if lookups else 0.0)
+
+    def describe(self):
+        s = self.stats()
+        return f"cache: {s['hits']} acertos, {s['misses']} falhas ({s['hit_rate']:.0%}) | {s['size']} entradas"
+
+# Cache compartilhado pelo processo (sobrevive às reexecuções do Streamlit)
+query_cache = QueryCache()
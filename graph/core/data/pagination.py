@@ -0,0 +1,91 @@
+import asyncio
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+
+API_BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
+
+# Maior tamanho de página aceito pela API da Câmara
+MAX_ITENS_POR_PAGINA = 100
+
+
+class IncompletePagesError(RuntimeError):
+    """
+    Algumas páginas (além da primeira) falharam mesmo após as novas tentativas.
+    `failed_pages` lista os números das páginas; o resultado parcial é descartado.
+    """
+
+    def __init__(self, failed_pages):
+        self.failed_pages = sorted(failed_pages)
+        super().__init__(f"Falha ao buscar as páginas {self.failed_pages}")
+
+
+def get_last_page(payload):
+    """
+    Lê o número da última página a partir dos links de paginação da resposta da API.
+    Retorna 1 se a resposta não trouxer o link 'last'.
+    """
+    for link in payload.get("links") or []:
+        if link.get("rel") == "last":
+            pagina = parse_qs(urlparse(link.get("href", "")).query).get("pagina", ["1"])[0]
+            return int(pagina)
+    return 1
+
+def fetch_all_pages(fetch_page, max_workers=4):
+    """
+    Busca a primeira página para descobrir o total de páginas e então
+    busca as demais em paralelo.
+
+    `fetch_page(pagina)` deve retornar o JSON completo da resposta (com 'dados' e 'links').
+    Uma falha na primeira página é propagada; se alguma das demais falhar, lança
+    IncompletePagesError (o chamador decide se descarta ou tenta de novo aquele recurso).
+    Retorna a lista de 'dados' de todas as páginas, na ordem das páginas.
+    """
+    primeira = fetch_page(1)
+    ultima = get_last_page(primeira)
+    paginas = {1: primeira.get("dados", [])}
+    falhas = []
+
+    if ultima > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_pagina = {
+                executor.submit(fetch_page, pagina): pagina
+                for pagina in range(2, ultima + 1)
+            }
+            for future, pagina in future_to_pagina.items():
+                try:
+                    paginas[pagina] = future.result().get("dados", [])
+                except Exception as e:
+                    print(f"[ERRO] Falha ao buscar a página {pagina}: {e}")
+                    falhas.append(pagina)
+
+    if falhas:
+        raise IncompletePagesError(falhas)
+    return [item for pagina in sorted(paginas) for item in paginas[pagina]]
+
+async def fetch_all_pages_async(fetch_page):
+    """
+    Versão assíncrona de fetch_all_pages: `fetch_page(pagina)` é uma corrotina.
+    O limite de concorrência fica a cargo de quem implementa `fetch_page`.
+    Como na versão síncrona, falhas em páginas além da primeira lançam IncompletePagesError.
+    """
+    primeira = await fetch_page(1)
+    ultima = get_last_page(primeira)
+
+    restantes = await asyncio.gather(
+        *[fetch_page(pagina) for pagina in range(2, ultima + 1)],
+        return_exceptions=True
+    )
+
+    dados = list(primeira.get("dados", []))
+    falhas = []
+    for pagina, payload in enumerate(restantes, start=2):
+        if isinstance(payload, BaseException):
+            print(f"[ERRO] Falha ao buscar a página {pagina}: {payload}")
+            falhas.append(pagina)
+            continue
+        dados.extend(payload.get("dados", []))
+
+    if falhas:
+        raise IncompletePagesError(falhas)
+    return dados
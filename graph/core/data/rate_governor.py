@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+
+
+# Status que indicam que a API está nos limitando ou sobrecarregada
+THROTTLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class AIMDGovernor:
+    """
+    Controlador adaptativo de concorrência (AIMD - additive increase / multiplicative decrease).
+
+    O limite de requisições em andamento cresce aos poucos enquanto as respostas chegam
+    rápidas e sem erro, e é reduzido pela metade (por padrão) ao observar 429/5xx de sobrecarga,
+    falhas de conexão ou latência muito acima da linha de base. A linha de base é a menor
+    latência média dos últimos `baseline_window` segundos, para acompanhar mudanças duradouras
+    na latência do servidor.
+    Pode ser usado tanto por threads (`slot`) quanto por corrotinas (`async_slot`).
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=64, increase=1.0, decrease=0.5,
+                 latency_tolerance=2.0, cooldown=1.0, window=10.0, baseline_window=60.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.window = window
+        self.baseline_window = baseline_window
+
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters = []
+        self._latency_ewma = None
+        self._latency_base = None
+        self._latency_minima = deque()
+        self._last_decrease = 0.0
+        self._completed = deque()
+        self._throttled = 0
+        self._total = 0
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def _wake(self):
+        self._cond.notify_all()
+        for future in self._async_waiters:
+            if not future.done():
+                future.get_loop().call_soon_threadsafe(self._resolve, future)
+        self._async_waiters = []
+
+    @staticmethod
+    def _resolve(future):
+        if not future.done():
+            future.set_result(None)
+
+    @contextmanager
+    def slot(self):
+        """
+        Reserva uma vaga de requisição (bloqueia a thread enquanto o limite estiver cheio).
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._wake()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """
+        Versão assíncrona de `slot`.
+        """
+        while True:
+            with self._lock:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    break
+                future = asyncio.get_running_loop().create_future()
+                self._async_waiters.append(future)
+            await future
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._wake()
+
+    def record(self, latency, status=None, error=False):
+        """
+        Registra o resultado de uma requisição e ajusta o limite.
+        `status` é o código HTTP (None se não houve resposta); `error` indica falha de conexão/timeout.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._total += 1
+            self._completed.append(now)
+            while self._completed and now - self._completed[0] > self.window:
+                self._completed.popleft()
+
+            congested = error or status in THROTTLE_STATUS
+            if congested:
+                self._throttled += 1
+            elif latency is not None:
+                self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+                self._latency_base = self._windowed_minimum(now, self._latency_ewma)
+                congested = self._latency_ewma > self._latency_base * self.latency_tolerance
+
+            if congested:
+                # Uma redução por período de cooldown: uma rajada de 429 conta como um só sinal
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(self.min_limit, self._limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                # Cresce ~`increase` a cada `limit` respostas bem-sucedidas (como o TCP)
+                previous = self.limit
+                self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+                if self.limit > previous:
+                    self._wake()
+
+    def _windowed_minimum(self, now, value):
+        """
+        Menor valor dos últimos `baseline_window` segundos (fila monotônica de (instante, valor)).
+        """
+        minima = self._latency_minima
+        while minima and minima[-1][1] >= value:
+            minima.pop()
+        minima.append((now, value))
+        while now - minima[0][0] > self.baseline_window:
+            minima.popleft()
+        return minima[0][1]
+
+    def throughput(self):
+        """
+        Requisições concluídas por segundo na janela recente.
+        """
+        with self._lock:
+            if len(self._completed) < 2:
+                return 0.0
+            elapsed = self._completed[-1] - self._completed[0]
+            return (len(self._completed) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def stats(self):
+        """
+        Retorna o estado atual do controlador (para exibição no progresso).
+        """
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "throughput": self.throughput(),
+            "throttled": self._throttled,
+            "total": self._total,
+        }
+
+    def describe(self):
+        s = self.stats()
+        return f"limite: {s['limit']} | em andamento: {s['in_flight']} | {s['throughput']:.1f} req/s | limitadas: {s['throttled']}"
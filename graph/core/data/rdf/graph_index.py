@@ -0,0 +1,212 @@
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from rdflib import Literal
+from graph.core.data.rdf.triple_store import TripleStore
+from graph.core.data.rdf.nt_writer import nt_term_text, to_nt_term
+
+
+def predicate_label(predicate):
+    """
+    Rótulo curto do predicado (último segmento da URI), como nas arestas do NetworkX.
+    """
+    return str(predicate).split("/")[-1]
+
+
+class GraphIndex:
+    """
+    Grafo RDF em forma compacta: cada termo recebe um ID inteiro de nó e as arestas ficam
+    em arrays NumPy paralelos (origem, destino, tipo), em que o tipo é o índice do predicado.
+
+    Os textos dos nós ficam numa tabela à parte e só são materializados para exibição
+    (`label`, `labels`, `to_networkx(labels=True)`).
+    """
+
+    def __init__(self, src, dst, edge_type, predicates, terms, is_literal=None):
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.edge_type = np.asarray(edge_type, dtype=np.int32)
+        self.predicates = list(predicates)
+        self._terms = terms
+        self.is_literal = np.zeros(len(terms), dtype=bool) if is_literal is None else np.asarray(is_literal, dtype=bool)
+
+    @classmethod
+    def from_triples(cls, triples, include_literals=True):
+        """
+        Indexa triplas rdflib (um Graph, um TripleStore ou qualquer iterável de (s, p, o)),
+        internando cada termo uma única vez. Os IDs seguem a ordem do texto N-Triples dos termos,
+        como num TripleStore, e não dependem da ordem de iteração das triplas.
+        """
+        if isinstance(triples, TripleStore):
+            return cls.from_triple_store(triples, include_literals)
+
+        node_ids, predicate_ids = {}, {}
+        src, dst, edge_type = [], [], []
+        for s, p, o in triples:
+            if not include_literals and isinstance(o, Literal):
+                continue
+            src.append(node_ids.setdefault(s, len(node_ids)))
+            dst.append(node_ids.setdefault(o, len(node_ids)))
+            edge_type.append(predicate_ids.setdefault(p, len(predicate_ids)))
+
+        terms = sorted(node_ids, key=lambda t: to_nt_term(t).encode("utf-8"))
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[[node_ids[t] for t in terms]] = np.arange(len(terms))
+        predicates = sorted(predicate_ids, key=str)
+        predicate_rank = np.empty(len(predicates), dtype=np.int64)
+        predicate_rank[[predicate_ids[p] for p in predicates]] = np.arange(len(predicates))
+
+        is_literal = np.fromiter((isinstance(t, Literal) for t in terms), dtype=bool, count=len(terms))
+        src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+        return cls(rank[src], rank[dst], predicate_rank[np.asarray(edge_type, dtype=np.int64)],
+                   predicates, terms, is_literal)
+
+    @classmethod
+    def from_triple_store(cls, store, include_literals=True):
+        """
+        Indexa um TripleStore sem decodificar termos: os IDs do dicionário do armazenamento
+        são apenas renumerados para 0..n-1 (na mesma ordem), e os textos são lidos sob demanda.
+        """
+        spo = np.asarray(store.index("spo"))
+        s, p, o = spo[0], spo[1], spo[2]
+        first_resource = store.first_resource_id
+        if not include_literals:
+            keep = o >= first_resource
+            s, p, o = s[keep], p[keep], o[keep]
+
+        node_store_ids, endpoints = np.unique(np.concatenate([s, o]), return_inverse=True)
+        predicate_store_ids, edge_type = np.unique(p, return_inverse=True)
+        terms = _StoreTerms(store, node_store_ids)
+        predicates = [store.term(int(t)) for t in predicate_store_ids]
+        return cls(endpoints[:len(s)], endpoints[len(s):], edge_type, predicates, terms,
+                   node_store_ids < first_resource)
+
+    @property
+    def num_nodes(self):
+        return len(self._terms)
+
+    @property
+    def num_edges(self):
+        return len(self.src)
+
+    # --- Tabela de rótulos ---
+
+    def label(self, node_id):
+        """
+        Texto do nó (como str(termo)).
+        """
+        if isinstance(self._terms, _StoreTerms):
+            return self._terms.text(node_id)
+        return str(self._terms[int(node_id)])
+
+    def labels(self, node_ids=None):
+        """
+        Textos dos nós informados (todos, se None), na mesma ordem.
+        """
+        node_ids = range(self.num_nodes) if node_ids is None else node_ids
+        return [self.label(i) for i in node_ids]
+
+    def node_id(self, term):
+        """
+        ID de nó de um termo rdflib. None se o termo não estiver no grafo.
+        """
+        return self._terms.index_of(term) if isinstance(self._terms, _StoreTerms) else self._node_lookup().get(term)
+
+    def _node_lookup(self):
+        if not hasattr(self, "_lookup"):
+            self._lookup = {t: i for i, t in enumerate(self._terms)}
+        return self._lookup
+
+    def predicate_id(self, predicate):
+        """
+        Índice do predicado (tipo de aresta). None se o predicado não ocorrer.
+        """
+        try:
+            return self.predicates.index(predicate)
+        except ValueError:
+            return None
+
+    # --- Exportação ---
+
+    def edges(self, predicate=None):
+        """
+        Arrays (origem, destino, tipo) das arestas, opcionalmente só de um predicado.
+        """
+        if predicate is None:
+            return self.src, self.dst, self.edge_type
+        mask = self.edge_type == self.predicate_id(predicate)
+        return self.src[mask], self.dst[mask], self.edge_type[mask]
+
+    def to_csr(self, predicate=None, symmetric=False, dtype=np.float32):
+        """
+        Matriz de adjacência esparsa (n x n) em formato CSR. O valor de cada posição é o número
+        de arestas entre os dois nós; `symmetric=True` ignora a direção.
+        """
+        src, dst, _ = self.edges(predicate)
+        if symmetric:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        n = self.num_nodes
+        matrix = sparse.csr_matrix((np.ones(len(src), dtype=dtype), (src, dst)), shape=(n, n))
+        matrix.sum_duplicates()
+        return matrix
+
+    def to_csr_by_predicate(self, symmetric=False, dtype=np.float32):
+        """
+        Uma matriz CSR por predicado: {predicado: matriz}.
+        """
+        return {p: self.to_csr(p, symmetric, dtype) for p in self.predicates}
+
+    def to_networkx(self, labels=False):
+        """
+        DiGraph do NetworkX com as arestas adicionadas de uma só vez e o atributo `label`
+        (nome curto do predicado). Com `labels=False` os nós são os IDs inteiros; com `labels=True`
+        são os textos dos termos, como em `utils.convert_to_networkx`.
+        """
+        names = [predicate_label(p) for p in self.predicates]
+        graph = nx.DiGraph()
+        if labels:
+            node_labels = self.labels()
+            graph.add_edges_from(
+                (node_labels[s], node_labels[o], {"label": names[t]})
+                for s, o, t in zip(self.src.tolist(), self.dst.tolist(), self.edge_type.tolist())
+            )
+        else:
+            graph.add_nodes_from(range(self.num_nodes))
+            graph.add_edges_from(
+                (s, o, {"label": names[t]})
+                for s, o, t in zip(self.src.tolist(), self.dst.tolist(), self.edge_type.tolist())
+            )
+        return graph
+
+    def describe(self):
+        return (f"{self.num_nodes} nós ({int(self.is_literal.sum())} literais), "
+                f"{self.num_edges} arestas, {len(self.predicates)} predicados")
+
+
+class _StoreTerms:
+    """
+    Tabela de rótulos preguiçosa sobre o dicionário de um TripleStore.
+    """
+
+    def __init__(self, store, store_ids):
+        self.store = store
+        self.store_ids = store_ids
+
+    def __len__(self):
+        return len(self.store_ids)
+
+    def __getitem__(self, node_id):
+        return self.store.term(int(self.store_ids[node_id]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def text(self, node_id):
+        return nt_term_text(self.store.term_text(int(self.store_ids[node_id])))
+
+    def index_of(self, term):
+        store_id = self.store.lookup(term)
+        if store_id is None:
+            return None
+        pos = int(np.searchsorted(self.store_ids, store_id))
+        return pos if pos < len(self.store_ids) and self.store_ids[pos] == store_id else None
@@ -0,0 +1,91 @@
+import os
+import heapq
+import hashlib
+import tempfile
+from graph.core.data.rdf.nt_writer import iter_nt_file, open_nt_input, open_nt_output, parse_nt_line, from_nt_term
+
+
+# Linhas mantidas em memória por bloco da ordenação externa
+DEFAULT_RUN_SIZE = 1_000_000
+
+
+def _canonical_lines(nt_paths):
+    for path in nt_paths:
+        for s, p, o in iter_nt_file(path):
+            yield f"{s} {p} {o} .\n"
+
+def _write_run(lines, tmp_dir):
+    lines.sort()
+    fd, path = tempfile.mkstemp(suffix=".nt", dir=tmp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+        f.writelines(lines)
+    return path
+
+def _read_run(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from f
+
+def sort_nt_snapshot(nt_paths, output_path, run_size=DEFAULT_RUN_SIZE, tmp_dir=None):
+    """
+    Ordena e remove duplicatas de um snapshot N-Triples (um ou mais arquivos) com ordenação externa:
+    blocos de até `run_size` linhas são ordenados em memória, gravados em disco e intercalados.
+
+    Retorna (número de triplas, fingerprint), onde o fingerprint é o SHA-256 das linhas ordenadas,
+    portanto independente da ordem e da divisão em arquivos da entrada.
+    """
+    if isinstance(nt_paths, (str, os.PathLike)):
+        nt_paths = [nt_paths]
+
+    digest = hashlib.sha256()
+    count = 0
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        runs, lines = [], []
+        for line in _canonical_lines(nt_paths):
+            lines.append(line)
+            if len(lines) >= run_size:
+                runs.append(_write_run(lines, tmp))
+                lines = []
+        if lines or not runs:
+            runs.append(_write_run(lines, tmp))
+
+        previous = None
+        with open_nt_output(output_path) as out:
+            for line in heapq.merge(*[_read_run(r) for r in runs]):
+                if line == previous:
+                    continue
+                out.write(line)
+                digest.update(line.encode("utf-8"))
+                previous = line
+                count += 1
+
+    return count, digest.hexdigest()
+
+def _iter_sorted(path):
+    if path is None or not os.path.exists(path):
+        return
+    with open_nt_input(path) as f:
+        yield from f
+
+def diff_sorted_snapshots(old_path, new_path):
+    """
+    Compara dois snapshots ordenados (ver sort_nt_snapshot) em uma única passada, sem carregá-los
+    em memória. Gera ("+", linha) para triplas inseridas e ("-", linha) para triplas removidas.
+    `old_path` pode ser None (primeira carga: tudo é inserção).
+    """
+    old, new = _iter_sorted(old_path), _iter_sorted(new_path)
+    a, b = next(old, None), next(new, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a < b):
+            yield "-", a
+            a = next(old, None)
+        elif a is None or b < a:
+            yield "+", b
+            b = next(new, None)
+        else:
+            a, b = next(old, None), next(new, None)
+
+def parse_triple(line):
+    """
+    Converte uma linha N-Triples em tripla de termos rdflib.
+    """
+    return tuple(from_nt_term(term) for term in parse_nt_line(line))
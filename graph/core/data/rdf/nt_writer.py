@@ -0,0 +1,171 @@
+import gzip
+import re
+import pandas as pd
+from rdflib import URIRef, Literal, BNode
+from graph.core.data.io_utils import iter_table_chunks
+from graph.core.data.rdf.rdf_utils import DEPUTADOS_MAPPINGS, dataframe_to_term_columns
+
+
+def escape_literal(value):
+    """
+    Escapa um texto para literal N-Triples (mesmas regras do serializador do rdflib).
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"').replace("\r", "\\r")
+
+def escape_literals(values):
+    """
+    Escapa uma coluna de textos para literais N-Triples (mesmas regras do serializador do rdflib).
+    """
+    return (
+        values.str.replace("\\", "\\\\", regex=False)
+        .str.replace("\n", "\\n", regex=False)
+        .str.replace('"', '\\"', regex=False)
+        .str.replace("\r", "\\r", regex=False)
+    )
+
+def format_terms(values, term_type, datatype=None):
+    """
+    Converte uma coluna de textos léxicos em termos N-Triples (<uri> ou "literal"^^<datatype>).
+    """
+    if term_type == "uri":
+        return "<" + values + ">"
+    literals = '"' + escape_literals(values) + '"'
+    if datatype is not None:
+        literals = literals + f"^^<{datatype}>"
+    return literals
+
+_LITERAL_RE = re.compile(r'^"(.*)"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?$', re.DOTALL)
+_ESCAPE_RE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+def _unescape(value):
+    def replace(match):
+        code = match.group(1)
+        if code[0] in "uU" and len(code) > 1:
+            return chr(int(code[1:], 16))
+        return _ESCAPES.get(code, code)
+    return _ESCAPE_RE.sub(replace, value)
+
+def to_nt_term(term):
+    """
+    Converte um termo rdflib em sua forma N-Triples.
+    """
+    if isinstance(term, Literal):
+        text = f'"{escape_literal(str(term))}"'
+        if term.language:
+            return f"{text}@{term.language}"
+        if term.datatype:
+            return f"{text}^^<{term.datatype}>"
+        return text
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    return f"<{term}>"
+
+def from_nt_term(text):
+    """
+    Converte um termo em forma N-Triples (<uri>, _:bnode ou "literal") em termo rdflib.
+    """
+    if text.startswith("<"):
+        return URIRef(text[1:-1])
+    if text.startswith("_:"):
+        return BNode(text[2:])
+    match = _LITERAL_RE.match(text)
+    if not match:
+        raise ValueError(f"Termo N-Triples inválido: {text}")
+    value, language, datatype = match.groups()
+    return Literal(_unescape(value), lang=language, datatype=URIRef(datatype) if datatype else None)
+
+def nt_term_text(text):
+    """
+    Texto de um termo em forma N-Triples (como str() do termo rdflib), sem criar o termo rdflib.
+    """
+    if text.startswith("<"):
+        return text[1:-1]
+    if text.startswith("_:"):
+        return text[2:]
+    match = _LITERAL_RE.match(text)
+    if not match:
+        raise ValueError(f"Termo N-Triples inválido: {text}")
+    value = match.group(1)
+    return _unescape(value) if "\\" in value else value
+
+def parse_nt_line(line):
+    """
+    Separa uma linha N-Triples em (sujeito, predicado, objeto), ainda em forma N-Triples.
+    Retorna None para linhas vazias ou comentários.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    subject, rest = line.split(" ", 1)
+    predicate, obj = rest.lstrip().split(" ", 1)
+    return subject, predicate, obj.rstrip()[:-1].rstrip()
+
+def iter_nt_file(path):
+    """
+    Percorre as triplas de um arquivo N-Triples (comprimido ou não) como tuplas de textos N-Triples.
+    """
+    with open_nt_input(path) as f:
+        for line in f:
+            triple = parse_nt_line(line)
+            if triple:
+                yield triple
+
+def dataframe_to_nt_lines(df, mappings=DEPUTADOS_MAPPINGS):
+    """
+    Gera, por mapeamento, (linhas N-Triples em pd.Series, mapeamento) para um bloco do DataFrame.
+    """
+    for mapping in mappings:
+        for subjects, predicate, objects, term_type, datatype in dataframe_to_term_columns(df, mapping):
+            yield "<" + subjects + f"> <{predicate}> " + format_terms(objects, term_type, datatype) + " .\n", mapping
+
+def open_nt_output(output_path):
+    """
+    Abre o arquivo de saída em modo texto; caminhos terminados em .gz são comprimidos com gzip.
+    """
+    if str(output_path).endswith(".gz"):
+        return gzip.open(output_path, "wt", encoding="utf-8", newline="")
+    return open(output_path, "w", encoding="utf-8", newline="")
+
+def open_nt_input(path):
+    """
+    Abre um arquivo N-Triples (comprimido ou não) para leitura em modo texto.
+    """
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def write_nt_stream(chunks, out, mappings=DEPUTADOS_MAPPINGS):
+    """
+    Escreve em `out` as triplas de uma sequência de DataFrames, bloco a bloco.
+    Linhas repetidas são removidas dentro de cada bloco; nos mapeamentos com "distinct"
+    (deputados, partidos, UFs e fornecedores), as repetidas entre blocos são suprimidas por um
+    conjunto de hashes de 64 bits das linhas já escritas. As despesas (uma por linha) não
+    passam por esse conjunto, para manter a memória constante.
+    Retorna o número de triplas escritas.
+    """
+    seen = set()
+    total = 0
+
+    for df in chunks:
+        for lines, mapping in dataframe_to_nt_lines(df, mappings):
+            lines = lines.drop_duplicates()
+            if mapping.get("distinct"):
+                hashes = pd.util.hash_pandas_object(lines, index=False).to_numpy()
+                novas = [h not in seen for h in hashes.tolist()]
+                seen.update(hashes.tolist())
+                lines = lines[novas]
+            out.write("".join(lines.tolist()))
+            total += len(lines)
+
+    return total
+
+def stream_table_to_nt(source_path, output_path, mappings=DEPUTADOS_MAPPINGS, chunksize=50_000):
+    """
+    Transforma uma tabela (CSV ou Parquet) em N-Triples em streaming, com memória constante,
+    sem montar um rdflib.Graph.
+    """
+    with open_nt_output(output_path) as out:
+        total = write_nt_stream(iter_table_chunks(source_path, chunksize), out, mappings)
+    print(f"[INFO] Arquivo N-Triples '{output_path}' salvo com sucesso! ({total} triplas)")
+    return total
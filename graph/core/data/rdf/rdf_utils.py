@@ -1,5 +1,7 @@
 from rdflib import Graph, Literal, RDF, URIRef, Namespace
 from rdflib.namespace import FOAF, XSD
+from itertools import repeat
+import numpy as np
 import pandas as pd
 
 # Namespaces
@@ -18,42 +20,189 @@ def create_rdf_graph():
     g.bind("br", BR)
     return g
 
-def add_deputado_triples(g, row):
+# Mapeamentos declarativos tabela -> RDF.
+# "subject": (coluna, modelo da URI); "type": classe rdf:type;
+# "properties": (coluna, predicado, tipo do termo, modelo da URI ou datatype do literal);
+# "distinct": deduplica as linhas pelo sujeito e propriedades antes de gerar as triplas
+# (e, na escrita em streaming, as triplas repetidas entre blocos; ver nt_writer.write_nt_stream).
+DEPUTADO_MAPPING = {
+    "subject": ("id", str(BR) + "deputado/{}"),
+    "type": SCHEMA.Person,
+    "properties": [
+        ("nome", SCHEMA.name, "literal", None),
+        ("uriPartido", SCHEMA.memberOf, "uri", "{}"),
+        ("siglaUf", SCHEMA.addressRegion, "uri", str(BR) + "uf/{}"),
+        ("id", SCHEMA.identifier, "literal", XSD.integer),
+        ("uri", FOAF.page, "uri", "{}"),
+        ("urlFoto", SCHEMA.image, "uri", "{}"),
+        ("idLegislatura", POL.legislatura, "literal", XSD.integer),
+        ("email", SCHEMA.email, "literal", None),
+    ],
+    # O mesmo deputado aparece em várias linhas (ex.: uma por legislatura)
+    "distinct": True,
+}
+
+PARTIDO_MAPPING = {
+    "subject": ("uriPartido", "{}"),
+    "type": SCHEMA.Organization,
+    "properties": [
+        ("siglaPartido", SCHEMA.name, "literal", None),
+    ],
+    "distinct": True,
+}
+
+UF_MAPPING = {
+    "subject": ("siglaUf", str(BR) + "uf/{}"),
+    "type": SCHEMA.Place,
+    "properties": [
+        ("siglaUf", SCHEMA.name, "literal", None),
+    ],
+    "distinct": True,
+}
+
+DEPUTADOS_MAPPINGS = [DEPUTADO_MAPPING, PARTIDO_MAPPING, UF_MAPPING]
+
+# Despesas: cada linha vira um nó de despesa ligado ao deputado e ao fornecedor.
+# As colunas "despesa_id" e "fornecedor_id" são derivadas em prepare_despesas.
+DESPESA_MAPPING = {
+    "subject": ("despesa_id", str(BR) + "despesa/{}"),
+    "type": SCHEMA.Invoice,
+    "properties": [
+        ("deputado_id", SCHEMA.customer, "uri", str(BR) + "deputado/{}"),
+        ("fornecedor_id", SCHEMA.provider, "uri", str(BR) + "fornecedor/{}"),
+        ("tipoDespesa", SCHEMA.category, "literal", None),
+        ("tipoDocumento", POL.tipoDocumento, "literal", None),
+        ("numDocumento", POL.numDocumento, "literal", None),
+        ("dataDocumento", POL.dataDocumento, "literal", XSD.dateTime),
+        ("ano", POL.ano, "literal", XSD.integer),
+        ("mes", POL.mes, "literal", XSD.integer),
+        ("valorDocumento", POL.valorDocumento, "literal", XSD.decimal),
+        ("valorGlosa", POL.valorGlosa, "literal", XSD.decimal),
+        ("valorLiquido", SCHEMA.totalPaymentDue, "literal", XSD.decimal),
+        ("urlDocumento", SCHEMA.url, "uri", "{}"),
+    ],
+}
+
+FORNECEDOR_MAPPING = {
+    "subject": ("fornecedor_id", str(BR) + "fornecedor/{}"),
+    "type": SCHEMA.LocalBusiness,
+    "properties": [
+        ("nomeFornecedor", SCHEMA.name, "literal", None),
+        ("cnpjCpfFornecedor", SCHEMA.taxID, "literal", None),
+    ],
+    "distinct": True,
+}
+
+DESPESAS_MAPPINGS = [DESPESA_MAPPING, FORNECEDOR_MAPPING]
+
+# Campos que identificam uma despesa (usados para gerar um identificador estável)
+DESPESA_KEY_COLUMNS = ["deputado_id", "ano", "mes", "codDocumento", "numDocumento", "cnpjCpfFornecedor", "valorDocumento", "parcela"]
+
+def prepare_despesas(df):
     """
-    Adiciona as triplas RDF de um deputado ao grafo.
+    Deriva as colunas de identificação usadas pelos mapeamentos de despesas:
+    `despesa_id` (deputado + hash estável dos campos-chave) e
+    `fornecedor_id` (apenas os dígitos do CNPJ/CPF; ausente se não houver documento).
     """
-    deputado_uri = URIRef(f"https://dadosabertos.camara.leg.br/recurso/deputado/{row['id']}")
-    partido_uri = URIRef(row['uriPartido'])
-    uf_uri = URIRef(f"https://dadosabertos.camara.leg.br/recurso/uf/{row['siglaUf']}")
+    df = df.copy()
+    chave = pd.util.hash_pandas_object(df[DESPESA_KEY_COLUMNS].apply(_key_text), index=False)
+    df["despesa_id"] = df["deputado_id"].astype(str) + "-" + chave.map("{:016x}".format)
+    fornecedor = df["cnpjCpfFornecedor"].astype("string").str.replace(r"\D", "", regex=True)
+    df["fornecedor_id"] = fornecedor.where(fornecedor.str.len() > 0)
+    return df
 
-    # Deputado
-    g.add((deputado_uri, RDF.type, SCHEMA.Person))
-    g.add((deputado_uri, SCHEMA.name, Literal(row['nome'])))
-    g.add((deputado_uri, SCHEMA.memberOf, partido_uri))
-    g.add((deputado_uri, SCHEMA.addressRegion, uf_uri))
-    g.add((deputado_uri, SCHEMA.identifier, Literal(row['id'], datatype=XSD.integer)))
-    g.add((deputado_uri, FOAF.page, URIRef(row['uri'])))
-    g.add((deputado_uri, SCHEMA.image, URIRef(row['urlFoto'])))
-    g.add((deputado_uri, POL.legislatura, Literal(row['idLegislatura'], datatype=XSD.integer)))
+def _decimal_text(values):
+    """
+    Números em notação posicional, sem zeros à direita (ex.: 1e-05 -> "0.00001", 12.0 -> "12").
+    """
+    numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+    return numbers.map(lambda v: np.format_float_positional(v, trim="-"), na_action="ignore")
 
-    if pd.notna(row.get('email')):
-        g.add((deputado_uri, SCHEMA.email, Literal(row['email'])))
+def _key_text(values):
+    """
+    Texto canônico de uma coluna-chave, independente do tipo inferido no bloco: colunas inteiras
+    com nulos chegam como float64 ("123.0") e passam a "123", como nos blocos sem nulos.
+    """
+    if values.name == "valorDocumento" or pd.api.types.is_numeric_dtype(values):
+        return _decimal_text(values).astype("string")
+    return values.astype("string")
 
-    # Nó Partido
-    g.add((partido_uri, RDF.type, SCHEMA.Organization))
-    g.add((partido_uri, SCHEMA.name, Literal(row['siglaPartido'])))
+def _expand(template, values):
+    """
+    Aplica um modelo de URI ("prefixo{}sufixo") a uma coluna inteira de uma vez.
+    """
+    prefix, suffix = template.split("{}")
+    return prefix + values.astype(str) + suffix
 
-    # Nó UF
-    g.add((uf_uri, RDF.type, SCHEMA.Place))
-    g.add((uf_uri, SCHEMA.name, Literal(row['siglaUf'])))
+def _lexical(values, term_type, extra):
+    """
+    Forma léxica (texto) de cada valor da coluna, de acordo com o tipo do termo.
+    Valores que não podem ser convertidos para o datatype ficam ausentes (NA).
+    """
+    if term_type == "uri":
+        return _expand(extra, values)
+    if extra == XSD.integer:
+        return values.astype("int64").astype(str)
+    if extra == XSD.decimal:
+        # Notação posicional explícita: xsd:decimal não aceita expoente (ex.: 1e-05)
+        return _decimal_text(values)
+    if extra == XSD.dateTime:
+        # ISO 8601 em qualquer precisão ("2023-02-15" e "2023-02-14T00:00:00" na mesma coluna)
+        dates = pd.to_datetime(values, errors="coerce", format="ISO8601")
+        invalid = int(dates.isna().sum() - values.isna().sum())
+        if invalid:
+            print(f"[AVISO] {invalid} valores de '{values.name}' não são datas ISO 8601 e foram ignorados.")
+        return dates.dt.strftime("%Y-%m-%dT%H:%M:%S").where(dates.notna())
+    return values.astype(str)
+
+def mapping_columns(mapping):
+    subject_col = mapping["subject"][0]
+    return list(dict.fromkeys([subject_col, *(prop[0] for prop in mapping["properties"])]))
+
+def dataframe_to_term_columns(df, mapping):
+    """
+    Gera, coluna a coluna, as triplas de um mapeamento como textos léxicos:
+    lista de (sujeitos, predicado, objetos, tipo do termo, datatype), com sujeitos/objetos em pd.Series.
+    Valores ausentes não geram triplas.
+    """
+    if mapping.get("distinct"):
+        df = df.drop_duplicates(subset=mapping_columns(mapping))
+
+    subject_col, template = mapping["subject"]
+    df = df[df[subject_col].notna()]
+    subjects = _expand(template, df[subject_col])
+
+    columns = []
+    if mapping.get("type") is not None:
+        columns.append((subjects, RDF.type, pd.Series(str(mapping["type"]), index=subjects.index), "uri", None))
+
+    for col, predicate, term_type, extra in mapping["properties"]:
+        mask = df[col].notna()
+        objects = _lexical(df.loc[mask, col], term_type, extra).dropna()
+        datatype = extra if term_type == "literal" else None
+        columns.append((subjects.loc[objects.index], predicate, objects, term_type, datatype))
+
+    return columns
+
+def dataframe_to_triples(df, mappings=DEPUTADOS_MAPPINGS):
+    """
+    Converte o DataFrame em triplas rdflib, em lote, a partir dos mapeamentos declarativos.
+    """
+    for mapping in mappings:
+        for subjects, predicate, objects, term_type, datatype in dataframe_to_term_columns(df, mapping):
+            s_terms = map(URIRef, subjects.tolist())
+            if term_type == "uri":
+                o_terms = map(URIRef, objects.tolist())
+            else:
+                o_terms = (Literal(v, datatype=datatype) for v in objects.tolist())
+            yield from zip(s_terms, repeat(predicate), o_terms)
 
-def build_rdf_graph_from_dataframe(df):
+def build_rdf_graph_from_dataframe(df, mappings=DEPUTADOS_MAPPINGS):
     """
-    Cria e retorna o grafo RDF completo a partir do DataFrame.
+    Cria e retorna o grafo RDF completo a partir do DataFrame (transformação vetorizada, sem iterrows).
     """
     g = create_rdf_graph()
-    for _, row in df.iterrows():
-        add_deputado_triples(g, row)
+    g.addN((s, p, o, g) for s, p, o in dataframe_to_triples(df, mappings))
     return g
 
 def save_graph_as_nt(g, output_path):
@@ -0,0 +1,95 @@
+from rdflib import RDF, URIRef, BNode
+from graph.core.data.rdf.rdf_utils import create_rdf_graph, SCHEMA, BR
+
+
+def deputado_uri(deputado_id):
+    return URIRef(f"{BR}deputado/{deputado_id}")
+
+def extract_subgraph(source, seeds, hops=1, direction="both", label_predicates=(SCHEMA.name,),
+                     skip_predicates=(RDF.type,), verbose=False):
+    """
+    Extrai a vizinhança de k saltos (`hops`) de um ou mais nós em uma única busca em largura,
+    usando consultas indexadas por padrão em vez de percorrer todas as triplas.
+
+    `source` é qualquer objeto com `triples((s, p, o))` (rdflib.Graph ou TripleStore).
+    `direction` pode ser "out", "in" ou "both". As triplas com predicados em `skip_predicates`
+    (por padrão rdf:type) entram no resultado, mas não são percorridas, para não atravessar classes.
+    Para os nós da borda, são incluídas as triplas de `label_predicates` (ex.: o nome do partido e da UF).
+    """
+    result = create_rdf_graph()
+    frontier = {URIRef(s) if not isinstance(s, (URIRef, BNode)) else s for s in seeds}
+    visited = set(frontier)
+
+    def add(triple):
+        result.add(triple)
+        if verbose:
+            print(f"[INFO] Tripla adicionada: {triple[0]} {triple[1]} {triple[2]}")
+
+    for _ in range(hops):
+        reached = set()
+        for node in frontier:
+            if direction in ("out", "both"):
+                for s, p, o in source.triples((node, None, None)):
+                    add((s, p, o))
+                    if p not in skip_predicates and isinstance(o, (URIRef, BNode)):
+                        reached.add(o)
+            if direction in ("in", "both"):
+                for s, p, o in source.triples((None, None, node)):
+                    add((s, p, o))
+                    if p not in skip_predicates:
+                        reached.add(s)
+        frontier = reached - visited
+        visited |= reached
+        if not frontier:
+            break
+
+    for node in frontier:
+        for predicate in label_predicates:
+            for triple in source.triples((node, predicate, None)):
+                add(triple)
+
+    return result
+
+def extract_deputados_subgraph(source, deputado_ids, hops=1, verbose=False):
+    """
+    Vizinhança de k saltos (entrada e saída) de vários deputados de uma só vez.
+    """
+    return extract_subgraph(source, [deputado_uri(d) for d in deputado_ids], hops=hops, verbose=verbose)
+
+def split_subgraphs(triples, seeds, label_predicates=(SCHEMA.name,), skip_predicates=(RDF.type,)):
+    """
+    Separa, em uma única passada pelas triplas, a vizinhança de 1 salto (entrada e saída) de cada nó
+    em `seeds`, com os rótulos dos nós da borda, no mesmo formato de extract_subgraph.
+    Retorna {semente: [triplas]}.
+    """
+    seeds = set(seeds)
+    edges = {seed: [] for seed in seeds}
+    labels = {}
+
+    for s, p, o in triples:
+        if s in seeds:
+            edges[s].append((s, p, o))
+        if o in seeds and o != s:
+            edges[o].append((s, p, o))
+        if p in label_predicates:
+            labels.setdefault(s, []).append((s, p, o))
+
+    subgraphs = {}
+    for seed, triples_ in edges.items():
+        boundary = set()
+        for s, p, o in triples_:
+            if p in skip_predicates:
+                continue
+            neighbor = o if s == seed else s
+            if neighbor != seed and isinstance(neighbor, (URIRef, BNode)):
+                boundary.add(neighbor)
+        subgraphs[seed] = triples_ + [t for node in boundary for t in labels.get(node, [])]
+    return subgraphs
+
+def find_label(source, node, predicate=SCHEMA.name):
+    """
+    Retorna o primeiro valor do predicado de rótulo do nó (ou None).
+    """
+    for _, _, o in source.triples((node, predicate, None)):
+        return str(o)
+    return None
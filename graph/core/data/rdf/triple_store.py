@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import numpy as np
+from rdflib import Graph
+from graph.core.data.rdf.nt_writer import iter_nt_file, to_nt_term, from_nt_term
+
+
+# Ordens de indexação: posições (s=0, p=1, o=2) na ordem em que cada array é ordenado
+ORDERS = {
+    "spo": (0, 1, 2),
+    "pos": (1, 2, 0),
+    "osp": (2, 0, 1),
+}
+
+
+def build_triple_store(nt_paths, store_dir):
+    """
+    Gera um armazenamento compacto (no estilo HDT) a partir de um ou mais arquivos N-Triples:
+
+    - dicionário de termos: textos N-Triples ordenados (terms.bin + term_offsets.npy),
+      de modo que o ID de cada termo é a sua posição na ordem lexicográfica;
+    - as triplas como IDs inteiros, sem duplicatas, ordenadas em três índices (spo, pos, osp),
+      cada um salvo como array NumPy (3, n) para ser aberto com memory-map.
+    """
+    if isinstance(nt_paths, (str, os.PathLike)):
+        nt_paths = [nt_paths]
+    os.makedirs(store_dir, exist_ok=True)
+
+    term_ids = {}
+    ids = []
+    for path in nt_paths:
+        for triple in iter_nt_file(path):
+            ids.extend(term_ids.setdefault(term, len(term_ids)) for term in triple)
+
+    # Reordena os IDs provisórios para que o ID seja a posição do termo ordenado
+    terms = sorted(term_ids, key=lambda t: t.encode("utf-8"))
+    rank = np.empty(len(terms), dtype=np.int64)
+    rank[[term_ids[t] for t in terms]] = np.arange(len(terms))
+    del term_ids
+
+    dtype = np.int32 if len(terms) < 2 ** 31 else np.int64
+    triples = np.unique(rank[np.asarray(ids, dtype=np.int64)].reshape(-1, 3), axis=0).astype(dtype)
+    del ids
+
+    encoded = [t.encode("utf-8") for t in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in encoded], out=offsets[1:])
+    with open(os.path.join(store_dir, "terms.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(store_dir, "term_offsets.npy"), offsets)
+
+    for name, order in ORDERS.items():
+        arranged = triples[:, list(order)]
+        arranged = arranged[np.lexsort(arranged.T[::-1])]
+        np.save(os.path.join(store_dir, f"{name}.npy"), np.ascontiguousarray(arranged.T))
+
+    meta = {
+        "sources": [os.path.basename(str(p)) for p in nt_paths],
+        "terms": len(terms),
+        "triples": int(len(triples)),
+        "dtype": np.dtype(dtype).name,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(store_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"[INFO] Armazenamento compacto salvo em '{store_dir}' ({meta['triples']} triplas, {meta['terms']} termos).")
+    return store_dir
+
+
+class TripleStore:
+    """
+    Armazenamento compacto de triplas aberto com memory-map (ver build_triple_store).
+    A abertura é imediata: nada é lido até que termos ou triplas sejam consultados.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self._terms = np.memmap(os.path.join(store_dir, "terms.bin"), dtype=np.uint8, mode="r") \
+            if os.path.getsize(os.path.join(store_dir, "terms.bin")) else np.zeros(0, dtype=np.uint8)
+        self._offsets = np.load(os.path.join(store_dir, "term_offsets.npy"), mmap_mode="r")
+        self._index = {name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r") for name in ORDERS}
+
+    @classmethod
+    def open(cls, store_dir):
+        return cls(store_dir)
+
+    def __len__(self):
+        return self.meta["triples"]
+
+    @property
+    def num_terms(self):
+        return self.meta["terms"]
+
+    @property
+    def first_resource_id(self):
+        """
+        Como o dicionário é ordenado pelo texto N-Triples, os literais ('"...') ocupam os IDs
+        iniciais: todo ID menor que este é literal, e os demais são URIs ou blank nodes.
+        """
+        if not self.num_terms:
+            return 0
+        first_bytes = self._terms[np.asarray(self._offsets[:-1])]
+        return int(np.searchsorted(first_bytes, ord('"'), side="right"))
+
+    def index(self, name="spo"):
+        """
+        Índice (3, n) de IDs na ordem informada ("spo", "pos" ou "osp"), em memory-map.
+        """
+        return self._index[name]
+
+    # --- Dicionário de termos ---
+
+    def term_text(self, term_id):
+        """
+        Texto N-Triples do termo com o ID informado.
+        """
+        start, end = self._offsets[term_id], self._offsets[term_id + 1]
+        return self._terms[start:end].tobytes().decode("utf-8")
+
+    def term(self, term_id):
+        """
+        Termo rdflib correspondente ao ID.
+        """
+        return from_nt_term(self.term_text(term_id))
+
+    def lookup(self, term):
+        """
+        ID de um termo (rdflib ou texto N-Triples) por busca binária no dicionário. None se não existir.
+        """
+        text = term if isinstance(term, str) and not hasattr(term, "n3") else to_nt_term(term)
+        key = text.encode("utf-8")
+        lo, hi = 0, self.num_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._offsets[mid], self._offsets[mid + 1]
+            if self._terms[start:end].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.num_terms and self.term_text(lo) == text:
+            return lo
+        return None
+
+    # --- Consulta por padrão ---
+
+    def match_ids(self, s=None, p=None, o=None):
+        """
+        Triplas que casam com o padrão (IDs; None = qualquer valor).
+        Retorna um array (k, 3) de IDs em ordem (s, p, o).
+        """
+        bound = {0: s, 1: p, 2: o}
+        name = self._choose_index(s is not None, p is not None, o is not None)
+        order = ORDERS[name]
+        index = self._index[name]
+
+        lo, hi = 0, index.shape[1]
+        for level, position in enumerate(order):
+            key = bound[position]
+            if key is None:
+                break
+            column = index[level, lo:hi]
+            lo, hi = lo + int(np.searchsorted(column, key, "left")), lo + int(np.searchsorted(column, key, "right"))
+            if lo == hi:
+                break
+
+        # Filtra eventuais posições fixadas que não formam prefixo do índice escolhido
+        rows = np.asarray(index[:, lo:hi])
+        result = np.empty_like(rows)
+        result[list(order)] = rows
+        result = result.T
+        for position, key in bound.items():
+            if key is not None:
+                result = result[result[:, position] == key]
+        return result
+
+    @staticmethod
+    def _choose_index(s, p, o):
+        if s and not p and o:
+            return "osp"
+        if s:
+            return "spo"
+        if p:
+            return "pos"
+        if o:
+            return "osp"
+        return "spo"
+
+    def triples(self, pattern=(None, None, None)):
+        """
+        Interface compatível com rdflib.Graph.triples: recebe um padrão de termos rdflib
+        (None = qualquer) e gera triplas de termos rdflib.
+        """
+        ids = []
+        for term in pattern:
+            if term is None:
+                ids.append(None)
+                continue
+            term_id = self.lookup(term)
+            if term_id is None:
+                return
+            ids.append(term_id)
+
+        cache = {}
+        for row in self.match_ids(*ids):
+            yield tuple(cache[t] if t in cache else cache.setdefault(t, self.term(t)) for t in row.tolist())
+
+    def __iter__(self):
+        return self.triples()
+
+    def to_rdflib_graph(self, pattern=(None, None, None), graph=None):
+        """
+        Materializa as triplas (ou apenas as que casam com o padrão) em um rdflib.Graph.
+        """
+        g = graph if graph is not None else Graph()
+        g.addN((s, p, o, g) for s, p, o in self.triples(pattern))
+        return g
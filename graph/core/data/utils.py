@@ -1,7 +1,9 @@
 import os
 import matplotlib.pyplot as plt
 import networkx as nx
-from graph.config import IMG_DATA
+from graph.config import IMG_DATA, PLOT_EDGE_LABEL_MAX_EDGES
+from graph.core.data.layout import get_layout
+from graph.core.data.rdf.graph_index import GraphIndex
 
 
 def get_file_path(base_dir, filename):
@@ -12,25 +14,27 @@ def get_file_path(base_dir, filename):
 
 def convert_to_networkx(rdf_graph):
     """
-    Converte grafo RDFLib em grafo NetworkX para visualização.
+    Converte grafo RDFLib em grafo NetworkX para visualização (nós rotulados pelo texto dos termos).
+    Para análise, prefira `GraphIndex` (IDs inteiros e matrizes CSR).
     """
-    nx_graph = nx.DiGraph()
-    for s, p, o in rdf_graph:
-        s_label = str(s)
-        p_label = str(p.split("/")[-1])
-        o_label = str(o)
-        nx_graph.add_edge(s_label, o_label, label=p_label)
-    return nx_graph
+    return GraphIndex.from_triples(rdf_graph).to_networkx(labels=True)
 
-def plot_graph(nx_graph, title="Visualização do Grafo RDF", file_name="img_grafo.png"):
+def plot_graph(nx_graph, title="Visualização do Grafo RDF", file_name="img_grafo.png", layout="auto",
+               edge_label_max_edges=PLOT_EDGE_LABEL_MAX_EDGES):
     """
     Plota o grafo com Matplotlib, inclui data/hora e salva como imagem.
+    As posições vêm de `layout.get_layout` (algoritmo escolhido pelo tamanho/formato do grafo,
+    com cache em disco); os rótulos das arestas são omitidos acima de `edge_label_max_edges` arestas.
     """
-    pos = nx.spring_layout(nx_graph, seed=42)
+    pos = get_layout(nx_graph, layout)
+    n = max(nx_graph.number_of_nodes(), 1)
+    node_size = 2000 if n <= 50 else max(50, int(2000 * 50 / n))
+    font_size = 8 if n <= 50 else 5
     plt.figure(figsize=(15, 10))
-    nx.draw(nx_graph, pos, with_labels=True, node_size=2000, node_color="lightblue", font_size=8, font_weight="bold", edge_color="gray")
-    edge_labels = nx.get_edge_attributes(nx_graph, 'label')
-    nx.draw_networkx_edge_labels(nx_graph, pos, edge_labels=edge_labels, font_size=7)
+    nx.draw(nx_graph, pos, with_labels=True, node_size=node_size, node_color="lightblue", font_size=font_size, font_weight="bold", edge_color="gray")
+    if nx_graph.number_of_edges() <= edge_label_max_edges:
+        edge_labels = nx.get_edge_attributes(nx_graph, 'label')
+        nx.draw_networkx_edge_labels(nx_graph, pos, edge_labels=edge_labels, font_size=7)
     plt.title(title)
     plt.axis("off")
     save_path = os.path.join(IMG_DATA, file_name)
@@ -38,5 +42,3 @@ def plot_graph(nx_graph, title="Visualização do Grafo RDF", file_name="img_gra
     plt.close()
     print(f"[INFO] Grafo RDF convertido para NetworkX com {nx_graph.number_of_nodes()} nós e {nx_graph.number_of_edges()} arestas.")
     print(f"[INFO] Grafo RDF plotado e salvo como {save_path}.")
-
-    
\ No newline at end of file
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deputados (
+    deputado_id INTEGER PRIMARY KEY,
+    nome TEXT,
+    desde TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    deputado_id INTEGER NOT NULL,
+    pagina INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    PRIMARY KEY (deputado_id, pagina)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    deputado_id INTEGER NOT NULL,
+    pagina INTEGER NOT NULL,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (deputado_id, pagina)
+);
+CREATE TABLE IF NOT EXISTS dead_letter (
+    deputado_id INTEGER NOT NULL,
+    pagina INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    failed_at REAL NOT NULL,
+    PRIMARY KEY (deputado_id, pagina)
+);
+"""
+
+
+class PageWorkQueue:
+    """
+    Fila de trabalho persistente (SQLite) de tarefas (deputado, página).
+
+    Cada página concluída é gravada e confirmada assim que chega; falhas voltam
+    para a fila até `max_attempts` e depois vão para a tabela `dead_letter`.
+    Reexecutar a extração com o mesmo arquivo retoma apenas o trabalho pendente.
+    Todas as operações devem ser feitas pela mesma thread (a que coordena o pool).
+    """
+
+    def __init__(self, db_path, max_attempts=5):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def is_empty(self):
+        return self.conn.execute("SELECT COUNT(*) FROM deputados").fetchone()[0] == 0
+
+    def seed(self, deputados):
+        """
+        Registra os deputados e a tarefa da primeira página de cada um.
+        `deputados` é uma lista de (deputado_id, nome, desde), com `desde=(ano, mes)` ou None.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO deputados (deputado_id, nome, desde) VALUES (?, ?, ?)",
+                [(int(d), nome, json.dumps(desde) if desde else None) for d, nome, desde in deputados]
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (deputado_id, pagina) VALUES (?, 1)",
+                [(int(d),) for d, _, _ in deputados]
+            )
+
+    def deputados(self):
+        """
+        Retorna {deputado_id: (nome, desde)}.
+        """
+        rows = self.conn.execute("SELECT deputado_id, nome, desde FROM deputados")
+        return {d: (nome, json.loads(desde) if desde else None) for d, nome, desde in rows}
+
+    def pending(self):
+        """
+        Lista as tarefas pendentes como (deputado_id, pagina).
+        """
+        return self.conn.execute(
+            "SELECT deputado_id, pagina FROM tasks WHERE status = 'pending' ORDER BY deputado_id, pagina"
+        ).fetchall()
+
+    def _complete(self, deputado_id, pagina, dados):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (deputado_id, pagina, dados) VALUES (?, ?, ?)",
+            (int(deputado_id), pagina, json.dumps(dados, ensure_ascii=False))
+        )
+        self.conn.execute(
+            "UPDATE tasks SET status = 'done', last_error = NULL WHERE deputado_id = ? AND pagina = ?",
+            (int(deputado_id), pagina)
+        )
+
+    def _enqueue(self, deputado_id, paginas):
+        novas = []
+        for pagina in paginas:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO tasks (deputado_id, pagina) VALUES (?, ?)",
+                (int(deputado_id), pagina)
+            )
+            if cur.rowcount:
+                novas.append((int(deputado_id), pagina))
+        return novas
+
+    def complete(self, deputado_id, pagina, dados):
+        """
+        Grava os dados da página e marca a tarefa como concluída na mesma transação.
+        """
+        with self.conn:
+            self._complete(deputado_id, pagina, dados)
+
+    def complete_first_page(self, deputado_id, dados, ultima):
+        """
+        Conclui a página 1 e enfileira as páginas 2..`ultima` na mesma transação, para que
+        uma interrupção nunca deixe a primeira página concluída sem as demais na fila.
+        Retorna as tarefas efetivamente criadas.
+        """
+        with self.conn:
+            self._complete(deputado_id, 1, dados)
+            return self._enqueue(deputado_id, range(2, ultima + 1))
+
+    def fail(self, deputado_id, pagina, error):
+        """
+        Registra a falha de uma tarefa. Retorna True se ela deve ser tentada novamente,
+        False se foi movida para a dead letter.
+        """
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET attempts = attempts + 1, last_error = ? WHERE deputado_id = ? AND pagina = ?",
+                (str(error), int(deputado_id), pagina)
+            )
+            attempts = self.conn.execute(
+                "SELECT attempts FROM tasks WHERE deputado_id = ? AND pagina = ?",
+                (int(deputado_id), pagina)
+            ).fetchone()[0]
+
+            if attempts < self.max_attempts:
+                return True
+
+            self.conn.execute(
+                "UPDATE tasks SET status = 'dead' WHERE deputado_id = ? AND pagina = ?",
+                (int(deputado_id), pagina)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dead_letter (deputado_id, pagina, attempts, error, failed_at) VALUES (?, ?, ?, ?, ?)",
+                (int(deputado_id), pagina, attempts, str(error), time.time())
+            )
+            return False
+
+    def retry_dead_letters(self):
+        """
+        Devolve à fila as tarefas da dead letter. Retorna quantas foram reabertas.
+        """
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0 WHERE status = 'dead'"
+            )
+            self.conn.execute("DELETE FROM dead_letter")
+        return cur.rowcount
+
+    def dead_letters(self):
+        return self.conn.execute(
+            "SELECT deputado_id, pagina, attempts, error FROM dead_letter ORDER BY deputado_id, pagina"
+        ).fetchall()
+
+    def iter_pages(self):
+        """
+        Percorre as páginas concluídas como (deputado_id, pagina, dados), em ordem.
+        """
+        cur = self.conn.execute("SELECT deputado_id, pagina, dados FROM pages ORDER BY deputado_id, pagina")
+        for deputado_id, pagina, dados in cur:
+            yield deputado_id, pagina, json.loads(dados)
+
+    def remove(self):
+        """
+        Fecha e apaga o arquivo da fila (chamado ao final de uma execução completa).
+        """
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
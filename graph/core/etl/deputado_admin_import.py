@@ -0,0 +1,71 @@
+import os
+import sys
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from graph.config import PROCESSED_DATA, ID_LEGISLATURA, NEO4J_DATABASE
+from graph.core.data.neo4j.admin_import import export_admin_import
+from graph.core.data.neo4j.aggregates import rebuild_aggregates
+from graph.core.data.neo4j.bulk_loader import Neo4jBulkLoader
+from graph.core.data.neo4j.delta_loader import record_snapshot
+from graph.core.data.neo4j.query_cache import bump_graph_version
+from graph.core.etl.deputado_despesas_transformation import load_manifest
+
+
+def snapshot_sources(output_dir=PROCESSED_DATA):
+    """
+    Arquivos N-Triples da transformação por snapshot da carga incremental (ver load_delta):
+    {nome: [caminhos]}, apenas com os arquivos existentes.
+    """
+    sources = {f"deputados_legisl_{ID_LEGISLATURA}": [os.path.join(output_dir, f"deputados_legisl_{ID_LEGISLATURA}.nt")]}
+    manifest = load_manifest(output_dir)
+    if manifest:
+        sources[f"deputados_despesas_legisl_{ID_LEGISLATURA}"] = [
+            os.path.join(output_dir, shard["path"]) for shard in manifest["shards"]
+        ]
+    return {name: [p for p in paths if os.path.exists(p)] for name, paths in sources.items()}
+
+def admin_import_sources(output_dir=PROCESSED_DATA):
+    """
+    Arquivos N-Triples da transformação: deputados e, se existirem, os shards das despesas.
+    """
+    return [p for paths in snapshot_sources(output_dir).values() for p in paths]
+
+def finalize_admin_import(output_dir=PROCESSED_DATA, database=NEO4J_DATABASE):
+    """
+    Passos seguintes ao `neo4j-admin database import` (com o banco já iniciado): cria a restrição
+    n10s_unique_uri, registra os snapshots importados como a referência das cargas incrementais,
+    calcula os agregados materializados e incrementa a versão do grafo (invalidando os caches).
+    """
+    Neo4jBulkLoader(database=database).ensure_constraints()
+    for name, paths in snapshot_sources(output_dir).items():
+        if paths:
+            record_snapshot(paths, name)
+    rebuild_aggregates(database)
+    version = bump_graph_version(database)
+    print(f"[INFO] Importação finalizada; versão do grafo: {version}.")
+    return version
+
+def main(database=NEO4J_DATABASE, finalize=False):
+    """
+    Gera os CSVs do `neo4j-admin database import` para a carga inicial de um banco vazio.
+    Após a importação, execute novamente com `--finalizar` (ver finalize_admin_import).
+    """
+    print("#################################")
+    print("## Carga inicial - neo4j-admin ##")
+    print("#################################")
+
+    if finalize:
+        return finalize_admin_import(database=database)
+
+    output_dir = os.path.join(PROCESSED_DATA, f"neo4j_import_legisl_{ID_LEGISLATURA}")
+    command = export_admin_import(admin_import_sources(), output_dir, database=database)
+    print("[AVISO] Depois da importação, inicie o banco e execute "
+          "`python -m graph.core.etl.deputado_admin_import --finalizar` para registrar os snapshots "
+          "da carga incremental, calcular os agregados e invalidar os caches de consulta.")
+    return command
+
+if __name__ == "__main__":
+    main(finalize="--finalizar" in sys.argv[1:])
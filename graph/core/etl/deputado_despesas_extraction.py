@@ -3,13 +3,31 @@ import pandas as pd
 import os
 import sys
 import time
+import csv
+import asyncio
+from datetime import date
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import aiohttp
 import psutil
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from graph.config import RAW_DATA
-from graph.core.data.io_utils import save_to_csv
+from graph.config import RAW_DATA, EXTRACTION_MAX_CONCURRENCY, EXTRACTION_LIMIT_PER_HOST
+from graph.core.data.io_utils import CsvStreamWriter, load_json, save_json, csv_to_parquet, DESPESAS_SCHEMA
+from graph.core.data.http_client import get_json, get_session, get_json_async, create_async_session
+from graph.core.data.rate_governor import AIMDGovernor
+from graph.core.data.pagination import API_BASE_URL, MAX_ITENS_POR_PAGINA, IncompletePagesError, get_last_page, fetch_all_pages, fetch_all_pages_async
+from graph.core.data.work_queue import PageWorkQueue
+
+
+# Esquema fixo do CSV de despesas (campos da API + identificação do deputado)
+DESPESAS_COLUMNS = [
+    "ano", "mes", "tipoDespesa", "codDocumento", "tipoDocumento", "codTipoDocumento",
+    "dataDocumento", "numDocumento", "valorDocumento", "urlDocumento", "nomeFornecedor",
+    "cnpjCpfFornecedor", "valorLiquido", "valorGlosa", "numRessarcimento", "codLote",
+    "parcela", "deputado_id", "deputado_nome",
+]
 
 
 def print_thread_info(stage=""):
@@ -18,83 +36,370 @@ def print_thread_info(stage=""):
     thread_count = process.num_threads()
     print(f"[THREAD INFO] {stage} - Total de threads ativas: {thread_count}")
 
-def fetch_despesas_deputado(deputado_id, nome, ordenar_por="ano", ordem="ASC"):
-    despesas = []
-    pagina = 1
+def _despesas_request(deputado_id, pagina, ordenar_por, ordem, itens, desde=None):
+    """
+    Monta a URL e os parâmetros da consulta de despesas.
+    Com `desde=(ano, mes)`, filtra pelos anos a partir da marca d'água (filtro `ano` da API).
+    """
+    url = f"{API_BASE_URL}/deputados/{deputado_id}/despesas"
+    params = [("ordem", ordem), ("ordenarPor", ordenar_por), ("pagina", pagina), ("itens", itens)]
+    if desde:
+        params += [("ano", ano) for ano in range(desde[0], date.today().year + 1)]
+    return url, params
 
-    while True:
-        url = f"https://dadosabertos.camara.leg.br/api/v2/deputados/{deputado_id}/despesas?ordem={ordem}&ordenarPor={ordenar_por}&pagina={pagina}"
-        headers = {"accept": "application/json"}
+def fetch_despesas_page(deputado_id, pagina=1, ordenar_por="ano", ordem="ASC", itens=MAX_ITENS_POR_PAGINA, session=None, governor=None, desde=None):
+    """
+    Busca uma página de despesas de um deputado e retorna o JSON completo (dados e links).
+    """
+    url, params = _despesas_request(deputado_id, pagina, ordenar_por, ordem, itens, desde)
+    return get_json(url, params=params, session=session, governor=governor)
 
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json().get("dados", [])
+def _tag_despesas(despesas, deputado_id, nome, desde=None):
+    """
+    Identifica o deputado em cada despesa e, no modo incremental, descarta
+    os meses anteriores à marca d'água `desde=(ano, mes)`.
+    """
+    if desde:
+        despesas = [d for d in despesas if (d.get("ano", 0), d.get("mes", 0)) >= tuple(desde)]
+    for d in despesas:
+        d["deputado_id"] = deputado_id
+        d["deputado_nome"] = nome
+    return despesas
 
-            if not data:
-                break
+def fetch_despesas_deputado(deputado_id, nome, ordenar_por="ano", ordem="ASC", page_workers=4, session=None, governor=None, desde=None):
+    try:
+        despesas = fetch_all_pages(
+            lambda pagina: fetch_despesas_page(deputado_id, pagina, ordenar_por, ordem, session=session, governor=governor, desde=desde),
+            max_workers=page_workers
+        )
+    except (requests.RequestException, IncompletePagesError) as e:
+        # Deputado incompleto fica de fora (e mantém a marca d'água) em vez de gravar só parte das despesas
+        print(f"[ERRO] {nome} ({deputado_id}): {e}")
+        return []
 
-            for d in data:
-                d["deputado_id"] = deputado_id
-                d["deputado_nome"] = nome
+    return _tag_despesas(despesas, deputado_id, nome, desde)
 
-            despesas.extend(data)
-            pagina += 1
-        except requests.RequestException as e:
-            print(f"[ERRO] {nome} ({deputado_id}): {e}")
-            break
+async def _fetch_despesas_page_async(session, semaphore, deputado_id, pagina, ordenar_por="ano", ordem="ASC", itens=MAX_ITENS_POR_PAGINA, governor=None, desde=None):
+    """
+    Busca uma página de despesas de forma assíncrona, respeitando o limite global de concorrência
+    (semáforo fixo ou, se informado, o governor adaptativo).
+    """
+    url, params = _despesas_request(deputado_id, pagina, ordenar_por, ordem, itens, desde)
+    return await get_json_async(session, url, params=params, semaphore=semaphore, governor=governor)
 
-    return despesas
+async def fetch_despesas_deputado_async(session, semaphore, deputado_id, nome, ordenar_por="ano", ordem="ASC", governor=None, desde=None):
+    """
+    Versão assíncrona de fetch_despesas_deputado: busca a primeira página,
+    descobre o total de páginas e busca as demais concorrentemente.
+    """
+    try:
+        despesas = await fetch_all_pages_async(
+            lambda pagina: _fetch_despesas_page_async(session, semaphore, deputado_id, pagina, ordenar_por, ordem, governor=governor, desde=desde)
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError, IncompletePagesError) as e:
+        print(f"[ERRO] {nome} ({deputado_id}): {e}")
+        return []
 
-def extraction_despesas_parallel(directory, max_workers=1, st_callback=None):
+    return _tag_despesas(despesas, deputado_id, nome, desde)
 
+def _progress_printer(st_callback=None, governor=None):
+    """
+    Retorna a função que exibe a barra de progresso no terminal ou no Streamlit.
+    Com um governor adaptativo, inclui o limite de concorrência atual e a vazão.
+    """
     def show_progress(current, total, width=30):
         percent = current / total
         bar = "#" * int(percent * width) + "." * (width - int(percent * width))
         text = f"[{bar}] {current}/{total} deputados ({percent:.2%})"
+        if governor:
+            text += f" | {governor.describe()}"
         if st_callback:
             st_callback(text)
         else:
             print(f"\r{text}", end="", flush=True)
 
+    return show_progress
+
+def _load_deputados(directory):
+    """
+    Carrega a lista de deputados extraída previamente, sem duplicados.
+    """
     filepath = os.path.join(directory, "deputados_legisl_57.csv")
-    df = pd.read_csv(filepath).drop_duplicates(subset=["id"])
-    total = len(df)
+    return pd.read_csv(filepath).drop_duplicates(subset=["id"])
 
-    print(f"[INFO] Extração paralela iniciada com {max_workers} threads para {total} deputados...\n")
+def _watermarks_path(directory):
+    return os.path.join(directory, "despesas_watermarks_legisl_57.json")
 
-    all_despesas = []
-    processed = 0
+def load_watermarks(directory):
+    """
+    Carrega as marcas d'água da extração incremental: {deputado_id: [ano, mes]}.
+    """
+    return load_json(_watermarks_path(directory), default={})
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_deputado = {
-            executor.submit(fetch_despesas_deputado, row["id"], row["nome"]): row["nome"]
-            for _, row in df.iterrows()
-        }
-
-        for future in as_completed(future_to_deputado):
-            nome = future_to_deputado[future]
-            try:
-                despesas = future.result()
-                all_despesas.extend(despesas)
-            except Exception as e:
-                print(f"\n[ERRO] Falha ao processar {nome}: {e}")
-
-            processed += 1
-            show_progress(processed, total)
+def update_watermarks(watermarks, ultimo):
+    """
+    Avança a marca d'água de cada deputado para o último período visto.
+    `ultimo` mapeia deputado_id -> ano * 100 + mes.
+    """
+    watermarks = dict(watermarks)
+    for deputado_id, periodo in ultimo.items():
+        watermarks[str(deputado_id)] = [int(periodo) // 100, int(periodo) % 100]
+    return watermarks
 
-    print("\n")  # Quebra de linha após a barra de progresso
+def _write_despesas(writer, despesas, ultimo):
+    """
+    Envia as despesas de um deputado ao arquivo e registra o último período visto.
+    """
+    writer.write_rows(despesas)
+    for d in despesas:
+        periodo = int(d["ano"]) * 100 + int(d["mes"])
+        if periodo > ultimo.get(d["deputado_id"], 0):
+            ultimo[d["deputado_id"]] = periodo
+
+def merge_despesas(save_path, novas_path, watermarks, refreshed):
+    """
+    Incorpora as despesas da extração incremental (em `novas_path`) ao CSV existente, linha a linha.
+    Para cada deputado em `refreshed`, as linhas antigas a partir da marca d'água
+    (ou todas, se o deputado não tinha marca) são substituídas pelas novas, evitando duplicados.
+    Retorna o total de linhas do arquivo final.
+    """
+    inicio = {}
+    for deputado_id in refreshed:
+        ano, mes = watermarks.get(str(deputado_id), [0, 0])
+        inicio[str(deputado_id)] = ano * 100 + mes
+
+    merged_path = f"{save_path}.merge"
+    total = 0
+    with open(merged_path, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out, lineterminator=os.linesep)
+        writer.writerow(DESPESAS_COLUMNS)
+
+        with open(save_path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                corte = inicio.get(row["deputado_id"])
+                if corte is not None and int(row["ano"]) * 100 + int(row["mes"]) >= corte:
+                    continue
+                writer.writerow([row.get(c, "") for c in DESPESAS_COLUMNS])
+                total += 1
+
+        with open(novas_path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                writer.writerow(row)
+                total += 1
+
+    os.replace(merged_path, save_path)
+    os.remove(novas_path)
+    return total
 
-    if all_despesas:
-        save_path = os.path.join(directory, "deputados_despesas_legisl_57.csv")
-        save_to_csv(all_despesas, save_path)
+def _open_sink(directory):
+    """
+    Abre o arquivo de saída em streaming. As linhas vão para um arquivo parcial,
+    que só substitui o CSV final em _finish_despesas.
+    """
+    save_path = os.path.join(directory, "deputados_despesas_legisl_57.csv")
+    return CsvStreamWriter(f"{save_path}.parcial", DESPESAS_COLUMNS)
+
+def _finish_despesas(writer, directory, ultimo, incremental=False, watermarks=None):
+    """
+    Fecha o arquivo em streaming, publica o CSV final e registra as marcas d'água por deputado.
+    No modo incremental, mescla com o CSV existente.
+    """
+    writer.close()
+    save_path = os.path.join(directory, "deputados_despesas_legisl_57.csv")
+
+    if writer.rows and incremental and os.path.exists(save_path):
+        total = merge_despesas(save_path, writer.filepath, watermarks or {}, ultimo.keys())
+        save_json(update_watermarks(watermarks or {}, ultimo), _watermarks_path(directory))
+        print(f"\n[INFO] Extração incremental finalizada com sucesso!")
+        print(f"[INFO] Novas despesas obtidas: {writer.rows} | Total no arquivo: {total}")
+        print(f"[INFO] Arquivo salvo em: {save_path}")
+    elif writer.rows:
+        os.replace(writer.filepath, save_path)
+        save_json(update_watermarks(watermarks or {}, ultimo), _watermarks_path(directory))
         print(f"\n[INFO] Extração finalizada com sucesso!")
-        print(f"[INFO] Total de despesas processadas: {len(all_despesas)}")
+        print(f"[INFO] Total de despesas processadas: {writer.rows}")
         print(f"[INFO] Arquivo salvo em: {save_path}")
     else:
+        os.remove(writer.filepath)
         print("\n[AVISO] Nenhuma despesa foi encontrada.")
+        return
+
+    csv_to_parquet(save_path, schema=DESPESAS_SCHEMA)
+
+async def _extraction_despesas_async(directory, max_concurrency, limit_per_host, st_callback=None, adaptive=False, incremental=False):
+    watermarks = load_watermarks(directory) if incremental else {}
+    governor = AIMDGovernor(initial=min(4, max_concurrency), max_limit=max_concurrency) if adaptive else None
+    show_progress = _progress_printer(st_callback, governor)
+
+    df = _load_deputados(directory)
+    total = len(df)
+
+    print(f"[INFO] Extração assíncrona iniciada com até {max_concurrency} requisições simultâneas para {total} deputados...\n")
+
+    writer = _open_sink(directory)
+    ultimo = {}
+    processed = 0
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    try:
+        async with create_async_session(max_concurrency, limit_per_host) as session:
+            tasks = [
+                fetch_despesas_deputado_async(
+                    session, semaphore, row["id"], row["nome"],
+                    governor=governor, desde=watermarks.get(str(row["id"]))
+                )
+                for _, row in df.iterrows()
+            ]
+
+            for task in asyncio.as_completed(tasks):
+                try:
+                    despesas = await task
+                    _write_despesas(writer, despesas, ultimo)
+                except Exception as e:
+                    print(f"\n[ERRO] Falha ao processar deputado: {e}")
 
-def main():
+                processed += 1
+                show_progress(processed, total)
+
+        print("\n")  # Quebra de linha após a barra de progresso
+
+        _finish_despesas(writer, directory, ultimo, incremental, watermarks)
+    finally:
+        # Após uma publicação bem-sucedida o arquivo parcial já não existe
+        writer.discard()
+
+def extraction_despesas_async(directory, max_concurrency=EXTRACTION_MAX_CONCURRENCY, limit_per_host=EXTRACTION_LIMIT_PER_HOST, st_callback=None, adaptive=False, incremental=False):
+    """
+    Extração assíncrona das despesas: um único cliente HTTP compartilhado,
+    limite global de requisições em andamento e limite de conexões por host.
+    Com `adaptive=True`, o limite é ajustado durante a execução (AIMD) até `max_concurrency`.
+    Gera o mesmo CSV e usa o mesmo contrato de st_callback de extraction_despesas_parallel.
+    """
+    asyncio.run(_extraction_despesas_async(directory, max_concurrency, limit_per_host, st_callback, adaptive, incremental))
+
+def _queue_path(directory):
+    return os.path.join(directory, "despesas_queue_legisl_57.sqlite")
+
+def _export_queue(queue, directory, incremental):
+    """
+    Percorre as páginas gravadas na fila e as envia, página a página, ao CSV final.
+    """
+    deputados = queue.deputados()
+    writer = _open_sink(directory)
+    ultimo = {}
+    try:
+        for deputado_id, _, dados in queue.iter_pages():
+            nome, desde = deputados[deputado_id]
+            _write_despesas(writer, _tag_despesas(dados, deputado_id, nome, desde), ultimo)
+
+        watermarks = load_watermarks(directory) if incremental else {}
+        _finish_despesas(writer, directory, ultimo, incremental, watermarks)
+    finally:
+        writer.discard()
+
+def extraction_despesas_parallel(directory, max_workers=1, st_callback=None, adaptive=False, incremental=False, retry_dead=False):
+    """
+    Extração das despesas com um pool de threads, guiada por uma fila persistente
+    de tarefas (deputado, página) em RAW_DATA. Cada página concluída é gravada na hora;
+    se o processo cair, a próxima execução retoma apenas o que ficou pendente.
+    Páginas que falham repetidamente vão para a dead letter (`retry_dead=True` as reabre);
+    enquanto houver páginas na dead letter, o CSV final não é publicado.
+
+    Com `adaptive=True`, `max_workers` é apenas o ponto de partida: um AIMDGovernor ajusta
+    o número de requisições em andamento entre 1 e EXTRACTION_MAX_CONCURRENCY.
+    Com `incremental=True`, busca apenas os períodos a partir da marca d'água de cada deputado
+    e mescla o resultado no CSV existente. Retorna True se o CSV foi publicado.
+    """
+    governor = AIMDGovernor(initial=max_workers, max_limit=EXTRACTION_MAX_CONCURRENCY) if adaptive else None
+    show_progress = _progress_printer(st_callback, governor)
+
+    queue = PageWorkQueue(_queue_path(directory))
+    if queue.is_empty():
+        watermarks = load_watermarks(directory) if incremental else {}
+        df = _load_deputados(directory)
+        queue.seed([(row["id"], row["nome"], watermarks.get(str(row["id"]))) for _, row in df.iterrows()])
+    else:
+        print(f"[INFO] Retomando extração interrompida a partir de {queue.db_path}")
+        if retry_dead:
+            print(f"[INFO] {queue.retry_dead_letters()} páginas da dead letter devolvidas à fila.")
+
+    deputados = queue.deputados()
+    total = len(deputados)
+
+    if governor:
+        # As threads ficam disponíveis até o teto; quem controla o paralelismo real é o governor
+        max_workers = governor.max_limit
+        print(f"[INFO] Extração paralela adaptativa iniciada (limite inicial {governor.limit}, máximo {governor.max_limit}) para {total} deputados...\n")
+    else:
+        print(f"[INFO] Extração paralela iniciada com {max_workers} threads para {total} deputados...\n")
+
+    session = get_session(pool_size=max_workers)
+
+    pending = queue.pending()
+    pendentes_por_deputado = Counter(deputado_id for deputado_id, _ in pending)
+    processed = total - len(pendentes_por_deputado)
+    if processed:
+        show_progress(processed, total)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit(deputado_id, pagina):
+            future = executor.submit(
+                fetch_despesas_page, deputado_id, pagina,
+                session=session, governor=governor, desde=deputados[deputado_id][1]
+            )
+            futures[future] = (deputado_id, pagina)
+
+        futures = {}
+        for deputado_id, pagina in pending:
+            submit(deputado_id, pagina)
+
+        # Apenas esta thread escreve na fila; os workers só fazem as requisições
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                deputado_id, pagina = futures.pop(future)
+                try:
+                    payload = future.result()
+                except Exception as e:
+                    if queue.fail(deputado_id, pagina, e):
+                        submit(deputado_id, pagina)
+                        continue
+                    print(f"\n[ERRO] {deputados[deputado_id][0]} ({deputado_id}), página {pagina}: {e}")
+                else:
+                    if pagina == 1:
+                        novas = queue.complete_first_page(deputado_id, payload.get("dados", []), get_last_page(payload))
+                        for task in novas:
+                            submit(*task)
+                            pendentes_por_deputado[deputado_id] += 1
+                    else:
+                        queue.complete(deputado_id, pagina, payload.get("dados", []))
+
+                pendentes_por_deputado[deputado_id] -= 1
+                if pendentes_por_deputado[deputado_id] == 0:
+                    processed += 1
+                    show_progress(processed, total)
+
+    print("\n")  # Quebra de linha após a barra de progresso
+
+    dead = queue.dead_letters()
+    if dead:
+        # Publicar agora gravaria deputados incompletos e avançaria suas marcas d'água
+        print(f"[AVISO] {len(dead)} páginas falharam e estão na dead letter de {queue.db_path}.")
+        print("[AVISO] O CSV não foi publicado. Para tentar de novo, execute com `--reprocessar-dead-letter` "
+              "(ou marque \"Reprocessar dead letter\" na interface).")
+        queue.close()
+        return False
+
+    _export_queue(queue, directory, incremental)
+    queue.remove()
+    return True
+
+def main(use_async=False, adaptive=True, incremental=False, retry_dead=False):
     print("##############################################")
     print("## Extração Paralela - Despesas dos Deputados ##")
     print("###############################################\n")
@@ -102,7 +407,10 @@ def main():
     start_time = time.time()
 
     print_thread_info("Antes do processamento")
-    extraction_despesas_parallel(RAW_DATA)
+    if use_async:
+        extraction_despesas_async(RAW_DATA, adaptive=adaptive, incremental=incremental)
+    else:
+        extraction_despesas_parallel(RAW_DATA, adaptive=adaptive, incremental=incremental, retry_dead=retry_dead)
     print_thread_info("Depois do processamento")
 
     end_time = time.time()
@@ -111,4 +419,4 @@ def main():
     print(f"\n⏱ Tempo total de processamento: {int(mins)} min {int(secs)} seg")
 
 if __name__ == "__main__":
-    main()
+    main(retry_dead="--reprocessar-dead-letter" in sys.argv[1:])
@@ -0,0 +1,35 @@
+import os
+import sys
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from graph.config import PROCESSED_DATA, ID_LEGISLATURA, NEO4J_BATCH_SIZE, NEO4J_WRITE_WORKERS
+from graph.core.data.neo4j.delta_loader import load_delta
+from graph.core.etl.deputado_despesas_transformation import load_manifest
+
+
+def loading_despesas(output_dir=PROCESSED_DATA, batch_size=NEO4J_BATCH_SIZE, workers=NEO4J_WRITE_WORKERS):
+    """
+    Carrega no Neo4j os shards N-Triples das despesas listados no manifesto da transformação.
+    Apenas as triplas que mudaram desde a última carga são enviadas (ver load_delta).
+    """
+    manifest = load_manifest(output_dir)
+    if not manifest:
+        print("[ERRO] Manifesto das despesas não encontrado. Execute a etapa de transformação.")
+        return None
+
+    paths = [os.path.join(output_dir, shard["path"]) for shard in manifest["shards"]]
+    print(f"[INFO] Comparando {manifest['triplas']} triplas de {len(paths)} shards com a última carga...")
+    return load_delta(paths, name=f"deputados_despesas_legisl_{ID_LEGISLATURA}", batch_size=batch_size, workers=workers)
+
+def main():
+    print("##############################")
+    print("## Carga - Despesas Deputados ##")
+    print("##############################")
+
+    loading_despesas()
+
+if __name__ == "__main__":
+    main()
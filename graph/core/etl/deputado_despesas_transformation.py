@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Adiciona a raiz do projeto ao sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from graph.config import RAW_DATA, PROCESSED_DATA, ID_LEGISLATURA
+from graph.core.data.io_utils import (
+    load_table, iter_table_chunks, csv_to_parquet, resolve_table_path,
+    save_json, load_json, DESPESAS_SCHEMA
+)
+from graph.core.data.rdf.rdf_utils import DESPESAS_MAPPINGS, prepare_despesas
+from graph.core.data.rdf.nt_writer import open_nt_output, write_nt_stream
+from graph.core.data.rdf.triple_store import build_triple_store
+
+
+def manifest_path(output_dir=PROCESSED_DATA):
+    return os.path.join(output_dir, f"deputados_despesas_legisl_{ID_LEGISLATURA}.manifest.json")
+
+def load_manifest(output_dir=PROCESSED_DATA):
+    """
+    Carrega o manifesto dos shards de despesas (ou None se a transformação ainda não rodou).
+    """
+    return load_json(manifest_path(output_dir))
+
+def plan_shards(source_path, num_shards):
+    """
+    Distribui os deputados entre os shards, equilibrando o número de despesas de cada um.
+    Lê apenas a coluna deputado_id. Retorna uma lista de listas de IDs.
+    """
+    contagem = load_table(source_path, columns=["deputado_id"])["deputado_id"].value_counts()
+
+    shards = [[] for _ in range(num_shards)]
+    cargas = [0] * num_shards
+    for deputado_id, linhas in contagem.items():
+        alvo = cargas.index(min(cargas))
+        shards[alvo].append(int(deputado_id))
+        cargas[alvo] += int(linhas)
+
+    return [ids for ids in shards if ids]
+
+def transform_shard(source_path, output_path, deputado_ids, chunksize=50_000):
+    """
+    Transforma as despesas de um grupo de deputados em um shard N-Triples.
+    Executado em um processo do pool: lê apenas as linhas do shard (filtro na leitura do Parquet).
+    """
+    chunks = (
+        prepare_despesas(df)
+        for df in iter_table_chunks(source_path, chunksize, filters=[("deputado_id", "in", deputado_ids)])
+    )
+    with open_nt_output(output_path) as out:
+        total = write_nt_stream(chunks, out, DESPESAS_MAPPINGS)
+
+    return {"path": os.path.basename(output_path), "deputados": len(deputado_ids), "triplas": total}
+
+def transformation_despesas(source_path, output_dir=PROCESSED_DATA, max_workers=None, compress=False, compact=True):
+    """
+    Transforma as despesas em RDF em paralelo: um processo por shard (sharding por deputado_id),
+    um arquivo N-Triples por shard e um manifesto JSON listando os shards.
+    Com `compact=True`, gera também o armazenamento compacto com todos os shards.
+    """
+    if not source_path.endswith(".parquet"):
+        # O Parquet permite que cada processo leia só as linhas do seu shard
+        source_path = csv_to_parquet(source_path, schema=DESPESAS_SCHEMA)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    shards = plan_shards(source_path, max_workers)
+    base = f"deputados_despesas_legisl_{ID_LEGISLATURA}"
+    ext = ".nt.gz" if compress else ".nt"
+
+    print(f"[INFO] Transformação das despesas em {len(shards)} shards com até {max_workers} processos...")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(transform_shard, source_path, os.path.join(output_dir, f"{base}.part-{i:03d}{ext}"), ids)
+            for i, ids in enumerate(shards)
+        ]
+        resultados = [future.result() for future in futures]
+
+    manifest = {
+        "source": os.path.basename(source_path),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "shards": resultados,
+        "triplas": sum(r["triplas"] for r in resultados),
+    }
+    if compact:
+        store_dir = os.path.join(output_dir, f"{base}.hdt")
+        build_triple_store([os.path.join(output_dir, r["path"]) for r in resultados], store_dir)
+        manifest["store"] = os.path.basename(store_dir)
+
+    save_json(manifest, manifest_path(output_dir))
+    print(f"[INFO] {manifest['triplas']} triplas gravadas em {len(resultados)} shards. Manifesto: {manifest_path(output_dir)}")
+    return manifest
+
+def main(max_workers=None):
+    print("######################################")
+    print("## Transformação - Despesas Deputados ##")
+    print("######################################")
+    print("\n")
+
+    csv_path = os.path.join(RAW_DATA, f"deputados_despesas_legisl_{ID_LEGISLATURA}.csv")
+    transformation_despesas(resolve_table_path(csv_path), max_workers=max_workers)
+
+if __name__ == "__main__":
+    main()
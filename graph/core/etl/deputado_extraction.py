@@ -8,43 +8,52 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from graph.config import RAW_DATA, ID_LEGISLATURA
-from graph.core.data.io_utils import save_to_csv
+from graph.core.data.io_utils import save_to_csv, save_to_parquet, parquet_path, DEPUTADOS_SCHEMA
+from graph.core.data.http_client import get_json, get_session
+from graph.core.data.pagination import API_BASE_URL, MAX_ITENS_POR_PAGINA, IncompletePagesError, fetch_all_pages
 
 
-def fetch_deputados(ordem="ASC", ordenar_por="nome", pagina=1, idLegislatura=57):
+def fetch_deputados_page(ordem="ASC", ordenar_por="nome", pagina=1, idLegislatura=57, itens=MAX_ITENS_POR_PAGINA, max_workers=4):
     """
-    Faz a requisição à API da Câmara e retorna a lista de deputados de uma página específica.
+    Faz a requisição à API da Câmara e retorna o JSON completo de uma página (dados e links).
     """
-    url = f"https://dadosabertos.camara.leg.br/api/v2/deputados?idLegislatura={idLegislatura}&ordem={ordem}&ordenarPor={ordenar_por}&pagina={pagina}"
-    headers = {
-        "accept": "application/json"
+    url = f"{API_BASE_URL}/deputados"
+    params = {
+        "idLegislatura": idLegislatura,
+        "ordem": ordem,
+        "ordenarPor": ordenar_por,
+        "pagina": pagina,
+        "itens": itens
     }
 
+    return get_json(url, params=params, session=get_session(pool_size=max_workers))
+
+def fetch_deputados(ordem="ASC", ordenar_por="nome", pagina=1, idLegislatura=57):
+    """
+    Faz a requisição à API da Câmara e retorna a lista de deputados de uma página específica.
+    """
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_deputados_page(ordem=ordem, ordenar_por=ordenar_por, pagina=pagina, idLegislatura=idLegislatura)
         return data.get("dados", [])
     except requests.RequestException as e:
         print(f"[ERRO] Falha na requisição: {e}")
         return []
 
-def fetch_all_deputados(idLegislatura=57):
+def fetch_all_deputados(idLegislatura=57, max_workers=4):
     """    
     Faz a requisição de todas as páginas de deputados.
+    A primeira página informa o total de páginas; as demais são buscadas em paralelo.
     """
-    deputados_total = []
-    pagina = 1
-
-    while True:
-        deputados = fetch_deputados(pagina=pagina, idLegislatura=idLegislatura)
-        if not deputados:
-            break
-
-        deputados_total.extend(deputados)
-        print(f"[INFO] Página {pagina} processada com {len(deputados)} deputados.")
-        pagina += 1
+    try:
+        deputados_total = fetch_all_pages(
+            lambda pagina: fetch_deputados_page(pagina=pagina, idLegislatura=idLegislatura, max_workers=max_workers),
+            max_workers=max_workers
+        )
+    except (requests.RequestException, IncompletePagesError) as e:
+        print(f"[ERRO] Falha na requisição: {e}")
+        return []
 
+    print(f"[INFO] {len(deputados_total)} deputados obtidos.")
     return deputados_total
 
 def extraction_deputado(directory):
@@ -53,8 +62,13 @@ def extraction_deputado(directory):
     idLegislatura = ID_LEGISLATURA
 
     deputados = fetch_all_deputados(idLegislatura)
+    if not deputados:
+        # Não substitui a lista anterior por uma vazia ou incompleta
+        print("[ERRO] Lista de deputados não obtida; arquivo existente mantido.")
+        return
     filepath = os.path.join(directory, f"deputados_legisl_{ID_LEGISLATURA}.csv")
     save_to_csv(deputados, filepath)
+    save_to_parquet(deputados, parquet_path(filepath), DEPUTADOS_SCHEMA)
 
 def main():
     print("##########################")
@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Adiciona a raiz do projeto ao sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from rdflib import RDF
+from graph.config import PROCESSED_DATA, IMG_DATA, ID_LEGISLATURA
+from graph.core.data.io_utils import load_json, save_json
+from graph.core.data.rdf.rdf_utils import SCHEMA, load_rdf_graph, create_rdf_graph
+from graph.core.data.rdf.nt_writer import to_nt_term, from_nt_term, parse_nt_line
+from graph.core.data.rdf.triple_store import TripleStore
+from graph.core.data.rdf.subgraph import split_subgraphs, deputado_uri
+
+
+# Imagens por deputado (geradas; a imagem de exemplo versionada continua em IMG_DATA)
+IMAGES_DIR = "deputados"
+
+# Altere quando o desenho mudar, para que todas as imagens sejam refeitas
+RENDER_VERSION = 1
+
+
+def manifest_path(img_dir=IMG_DATA):
+    return os.path.join(img_dir, IMAGES_DIR, "manifest.json")
+
+def load_images_manifest(img_dir=IMG_DATA):
+    """
+    Manifesto das imagens: {"deputados": {id: {"nome", "image", "hash"}}, ...} (ou None).
+    O caminho da imagem é relativo a IMG_DATA.
+    """
+    return load_json(manifest_path(img_dir))
+
+def image_for(deputado_id, img_dir=IMG_DATA):
+    """
+    Caminho absoluto da imagem do deputado segundo o manifesto (None se ainda não foi gerada).
+    """
+    manifest = load_images_manifest(img_dir) or {}
+    entry = manifest.get("deputados", {}).get(str(deputado_id))
+    if not entry:
+        return None
+    path = os.path.join(img_dir, entry["image"])
+    return path if os.path.exists(path) else None
+
+def open_source(processed_dir=PROCESSED_DATA):
+    """
+    Abre o grafo dos deputados: o armazenamento compacto, se existir, ou o .nt.
+    """
+    store_dir = os.path.join(processed_dir, f"deputados_legisl_{ID_LEGISLATURA}.hdt")
+    if os.path.exists(store_dir):
+        return TripleStore.open(store_dir)
+    return load_rdf_graph(os.path.join(processed_dir, f"deputados_legisl_{ID_LEGISLATURA}.nt"))
+
+def subgraph_hash(lines):
+    """
+    Hash do subgrafo (linhas N-Triples ordenadas) e da versão do desenho.
+    """
+    digest = hashlib.sha1(f"v{RENDER_VERSION}\n".encode("utf-8"))
+    for line in lines:
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+def _remove_image(entry, img_dir):
+    path = os.path.join(img_dir, entry["image"])
+    if os.path.exists(path):
+        os.remove(path)
+
+def _init_worker():
+    # Backend sem interface gráfica nos processos do pool
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+def render_deputado_image(deputado_id, nome, lines, image_path):
+    """
+    Desenha a imagem de um deputado a partir das linhas N-Triples do seu subgrafo.
+    Executado em um processo do pool.
+    """
+    from graph.core.data.utils import convert_to_networkx, plot_graph
+
+    graph = create_rdf_graph()
+    graph.addN((*(from_nt_term(t) for t in parse_nt_line(line)), graph) for line in lines)
+    plot_graph(convert_to_networkx(graph), title=f"Deputado: {nome}", file_name=image_path)
+    return deputado_id
+
+def render_deputados(source=None, deputado_ids=None, max_workers=None, img_dir=IMG_DATA, force=False):
+    """
+    Gera as imagens dos subgrafos dos deputados em paralelo (um processo por imagem, backend Agg).
+
+    Os subgrafos de todos os deputados são separados em uma única passada pelas triplas;
+    deputados cujo subgrafo não mudou desde a última execução (mesmo hash) não são redesenhados.
+    O manifesto (deputado → imagem) é sempre salvo ao final: imagens que falharam ficam fora dele
+    (e são refeitas na próxima execução) e, na execução completa, deputados que saíram do grafo
+    são removidos. Retorna o manifesto.
+    """
+    source = source if source is not None else open_source()
+    os.makedirs(os.path.join(img_dir, IMAGES_DIR), exist_ok=True)
+
+    if deputado_ids is None:
+        seeds = {s for s, _, _ in source.triples((None, RDF.type, SCHEMA.Person))}
+    else:
+        seeds = {deputado_uri(d) for d in deputado_ids}
+    subgraphs = split_subgraphs(source, seeds)
+
+    manifest = load_images_manifest(img_dir) or {"deputados": {}}
+    entries = manifest["deputados"]
+    if deputado_ids is None:
+        current = {str(seed).rstrip("/").rsplit("/", 1)[-1] for seed, triples in subgraphs.items() if triples}
+        for deputado_id in set(entries) - current:
+            _remove_image(entries.pop(deputado_id), img_dir)
+        print(f"[INFO] {len(entries)} deputados mantidos no manifesto.")
+    jobs = []
+    for seed, triples in subgraphs.items():
+        if not triples:
+            continue
+        deputado_id = str(seed).rstrip("/").rsplit("/", 1)[-1]
+        nome = next((str(o) for s, p, o in triples if s == seed and p == SCHEMA.name), deputado_id)
+        lines = sorted(f"{to_nt_term(s)} {to_nt_term(p)} {to_nt_term(o)} ." for s, p, o in triples)
+        digest = subgraph_hash(lines)
+        # Só o ID no nome do arquivo: a troca de nome do deputado reaproveita o mesmo arquivo
+        image = os.path.join(IMAGES_DIR, f"deputado_{deputado_id}_graph.png")
+
+        entry = entries.get(deputado_id)
+        if not force and entry and entry["hash"] == digest and os.path.exists(os.path.join(img_dir, entry["image"])):
+            continue
+        if entry and entry["image"] != image:
+            _remove_image(entry, img_dir)
+        entries[deputado_id] = {"nome": nome, "image": image, "hash": digest}
+        jobs.append((deputado_id, nome, lines, os.path.join(img_dir, image)))
+
+    print(f"[INFO] {len(jobs)} imagens a gerar; {len(subgraphs) - len(jobs)} deputados sem alterações.")
+    start = time.monotonic()
+    failed = 0
+    try:
+        if jobs:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+                futures = {executor.submit(render_deputado_image, *job): job[0] for job in jobs}
+                for future, deputado_id in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"[ERRO] Falha ao gerar a imagem do deputado {deputado_id}: {e}")
+                        # Sem entrada no manifesto, a imagem anterior (desatualizada) também sai
+                        _remove_image(entries.pop(deputado_id), img_dir)
+                        failed += 1
+    finally:
+        manifest["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        save_json(manifest, manifest_path(img_dir))
+
+    print(f"[INFO] {len(jobs) - failed} imagens geradas ({failed} falhas) em {time.monotonic() - start:.1f}s. "
+          f"Manifesto: {manifest_path(img_dir)}")
+    return manifest
+
+def main(max_workers=None):
+    print("##################################")
+    print("## Imagens - Grafos dos Deputados ##")
+    print("##################################")
+
+    render_deputados(max_workers=max_workers)
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,14 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
     
-from graph.core.etl import deputado_extraction, deputado_transformation, deputado_loading, deputado_despesas_extraction
-from graph.config import RAW_DATA, PROCESSED_DATA, IMG_DATA, ID_LEGISLATURA
+from graph.core.etl import deputado_extraction, deputado_transformation, deputado_loading, deputado_despesas_extraction, deputado_despesas_transformation, deputado_despesas_loading, deputado_rendering
+from graph.config import RAW_DATA, PROCESSED_DATA, IMG_DATA, ID_LEGISLATURA, ID_DEPUTADO
 from graph.core.data.neo4j.neo4j_utils import data_rdf_graph_neo4j, draw_neo4j_graph
+from graph.core.data.neo4j.query_cache import query_cache
+from graph.core.data.neo4j.cursor import CypherCursor
+from graph.core.data.io_utils import load_table, resolve_table_path
+from graph.core.data.analytics import get_analytics
+from graph.core.data.rdf.nt_writer import open_nt_input
 
 st.set_page_config(page_title="ETL - Deputados", layout="centered")
 # Exemplos de emojis:
@@ -34,14 +39,33 @@ csv_path = os.path.join(RAW_DATA, f"deputados_legisl_{ID_LEGISLATURA}.csv")
 csv_path_dep_despesas = os.path.join(RAW_DATA, f"deputados_despesas_legisl_{ID_LEGISLATURA}.csv")
 
 nt_path = os.path.join(PROCESSED_DATA, f"deputados_legisl_{ID_LEGISLATURA}.nt")
-nt_path_dep_despesas = os.path.join(PROCESSED_DATA, f"deputados_despesas_legisl_{ID_LEGISLATURA}.nt")
 
 # Menu principal com abas
 menu = st.sidebar.radio(
-        "Menu", ["🏛️ Início", "🧑‍💼ETL - Deputado", "🔍 Consulta - Cypher", "🧩 ETL - Despesas dos Deputados"],
+        "Menu", ["🏛️ Início", "🧑‍💼ETL - Deputado", "🔍 Consulta - Cypher", "🧩 ETL - Despesas dos Deputados", "📈 Análises do Grafo"],
         help="Selecione uma opção para iniciar o processo ETL."
         )
 
+def close_cypher_cursor():
+    # Libera a sessão e a transação (conexão do pool) abertas pelo cursor da consulta anterior
+    st.session_state.pop("cypher_page", None)
+    previous = st.session_state.pop("cypher_cursor", None)
+    if previous:
+        previous.close()
+
+def show_table_preview(csv_path, dataset):
+    # Prévia da tabela extraída: o Parquet, se estiver atualizado, ou o CSV (ver resolve_table_path)
+    path = resolve_table_path(csv_path)
+    if not os.path.exists(path):
+        st.warning("Tabela não encontrada. Execute a etapa de extração.")
+        return
+    formato = "Parquet" if str(path).endswith(".parquet") else "CSV"
+    st.markdown(f"**📄 {formato} - {dataset}** (`{os.path.basename(path)}`)")
+    st.dataframe(load_table(path).head(20))
+
+if menu != "🔍 Consulta - Cypher":
+    close_cypher_cursor()
+
 if menu == "🔍 Consulta - Cypher":
     st.markdown("🔍 Visualizador de Grafo RDF - Deputados")
 
@@ -82,6 +106,22 @@ ORDER BY total_deputados DESC""",
 """MATCH (d:Person)-[:addressRegion]->(uf:Place)
 RETURN uf.name AS estado, COUNT(d) AS total_deputados
 ORDER BY total_deputados DESC""",
+"Deputados por Partido (materializado)":
+"""MATCH (p:Organization) WHERE p.total_deputados > 0
+RETURN p.name AS partido, sum(p.total_deputados) AS total_deputados
+ORDER BY total_deputados DESC""",
+"Deputado por UF (materializado)":
+"""MATCH (uf:Place) WHERE uf.total_deputados > 0
+RETURN uf.name AS estado, sum(uf.total_deputados) AS total_deputados
+ORDER BY total_deputados DESC""",
+"Despesas por Partido (materializado)":
+"""MATCH (p:Organization) WHERE p.total_despesas > 0
+RETURN p.name AS partido, sum(p.total_despesas) AS total_despesas
+ORDER BY total_despesas DESC""",
+"Despesas por Mês (materializado)":
+"""MATCH (m:DespesaMensal)
+RETURN m.ano AS ano, m.mes AS mes, m.total AS total, m.despesas AS despesas
+ORDER BY ano, mes""",
 "Deputado - Recursos RDF":
 """MATCH (d:Person {identifier: 204396})-[r]-(n)
 RETURN d.name AS deputado, type(r) AS relacao, labels(n) AS tipo, n
@@ -98,23 +138,59 @@ RETURN d.name AS deputado, type(r) AS relacao, labels(n) AS tipo, n
         key="cypher_query_area"
     )
 
+    stream_mode = st.checkbox(
+        "Resultados paginados (streaming)", value=False,
+        help="Lê o resultado em páginas, sem carregar tudo na memória; útil para consultas sem LIMIT."
+    )
+
+    if not stream_mode:
+        close_cypher_cursor()
+
     if st.button("Executar consulta"):
+        close_cypher_cursor()
         with st.spinner("Executando..."):
-            data = data_rdf_graph_neo4j(cypher_query)
-            if data:                
-                df = pd.DataFrame(data)
-                st.success("Consulta realizada com sucesso!")
-                st.dataframe(df)
-
-                # Exibir grafo interativo
-                # Apenas se a consulta contiver colunas apropriadas
-                if {"source", "rel", "target"}.issubset(df.columns):
-                    st.markdown("### Visualização em Grafo")
-                    draw_neo4j_graph(cypher_query)
-                else:
-                   st.info("A visualização em grafo requer colunas: source | rel | target.")  
+            if stream_mode:
+                # A consulta roda uma vez; as próximas páginas continuam do mesmo cursor
+                cursor = CypherCursor(cypher_query)
+                st.session_state.cypher_cursor = cursor
+                st.session_state.cypher_page = cursor.fetch_page()
             else:
-                st.warning("Nenhum resultado encontrado.")            
+                data = data_rdf_graph_neo4j(cypher_query)
+                st.caption(query_cache.describe())
+                if data:                
+                    df = pd.DataFrame(data)
+                    st.success("Consulta realizada com sucesso!")
+                    st.dataframe(df)
+
+                    # Exibir grafo interativo
+                    # Apenas se a consulta contiver colunas apropriadas
+                    if {"source", "rel", "target"}.issubset(df.columns):
+                        st.markdown("### Visualização em Grafo")
+                        draw_neo4j_graph(records=data)
+                    else:
+                       st.info("A visualização em grafo requer colunas: source | rel | target.")  
+                else:
+                    st.warning("Nenhum resultado encontrado.")            
+
+    if stream_mode and "cypher_page" in st.session_state:
+        page = st.session_state.cypher_page
+        df = page["df"]
+        if len(df) or page["start_row"]:
+            st.success(f"Página {page['page']}: linhas {page['start_row'] + 1} a {page['start_row'] + len(df)} "
+                       f"({page['bytes'] / 1024 / 1024:.1f} MB)")
+            st.dataframe(df)
+            if page["truncated"]:
+                limite = "de linhas" if page["reason"] == "rows" else "de memória"
+                st.warning(f"⚠️ Resultado truncado pelo limite {limite} da página. Há mais registros.")
+                if st.button("Próxima página"):
+                    st.session_state.cypher_page = st.session_state.cypher_cursor.fetch_page()
+                    st.rerun()
+
+            if {"source", "rel", "target"}.issubset(df.columns):
+                st.markdown("### Visualização em Grafo")
+                draw_neo4j_graph(records=df.to_dict("records"))
+        else:
+            st.warning("Nenhum resultado encontrado.")
 
     # Estado para mostrar/ocultar exemplos
     show_examples = st.checkbox("Mostrar exemplos de consultas", value=False) 
@@ -126,6 +202,23 @@ RETURN d.name AS deputado, type(r) AS relacao, labels(n) AS tipo, n
                 st.session_state.cypher_query = query                
             st.code(f"// {label}\n{query}", language="cypher")
 
+if menu == "📈 Análises do Grafo":
+    st.markdown("📈 Métricas calculadas em memória sobre os grafos processados (sem consultar o Neo4j).")
+    try:
+        analytics = get_analytics()
+    except FileNotFoundError as e:
+        st.warning(str(e))
+    else:
+        metricas = analytics.metrics()
+        metrica = st.selectbox("Métrica", list(metricas))
+        with st.spinner("Calculando..."):
+            df = metricas[metrica]()
+        if len(df):
+            st.dataframe(df)
+        else:
+            st.info("Sem dados para esta métrica. Execute a transformação das despesas.")
+        st.caption(f"Snapshot: {analytics.snapshot}")
+
 if menu == "🏛️ Início":
     st.markdown("### Estudo de caso: Dados Abertos da Câmara dos Deputados")
     st.image(
@@ -160,12 +253,7 @@ if menu == "🧑‍💼ETL - Deputado":
         # Visualização de arquivos gerados
         st.markdown("---")
 
-        if os.path.exists(csv_path):
-            st.markdown("**📄 CSV - Deputados**")
-            df = pd.read_csv(csv_path)
-            st.dataframe(df.head(20))
-        else:
-            st.warning("CSV não encontrado. Execute a etapa de extração.")    
+        show_table_preview(csv_path, "Deputados")
 
     # Aba de Transformação
     with tab2:
@@ -193,10 +281,26 @@ if menu == "🧑‍💼ETL - Deputado":
             deputado_loading.main()
             st.success("✅ Carga concluída!")
 
+        if st.button("Gerar imagens de todos os deputados"):
+            with st.spinner("Gerando imagens..."):
+                deputado_rendering.main()
+            st.success("✅ Imagens geradas!")
+
         # Exibir imagem após a carga
         st.markdown("---")
-        image_path = os.path.join(IMG_DATA, "deputado_204445-Fernando Mineiro_graph.png")
-        if os.path.exists(image_path):
+        images_manifest = deputado_rendering.load_images_manifest() or {"deputados": {}}
+        deputados_imagens = images_manifest["deputados"]
+        if deputados_imagens:
+            ids = sorted(deputados_imagens, key=lambda d: deputados_imagens[d]["nome"])
+            padrao = str(ID_DEPUTADO) if str(ID_DEPUTADO) in deputados_imagens else ids[0]
+            deputado_id = st.selectbox(
+                "Deputado", ids, index=ids.index(padrao),
+                format_func=lambda d: f"{deputados_imagens[d]['nome']} ({d})"
+            )
+            image_path = deputado_rendering.image_for(deputado_id)
+        else:
+            image_path = None
+        if image_path:
             st.markdown("### 🖼️ Visualização do Grafo do Deputado")
             st.image(
                 image_path,
@@ -215,6 +319,13 @@ if menu == "🧩 ETL - Despesas dos Deputados":
     # Aba de Extração
     with tab1:
         st.header("🔁 Extração")
+        use_async = st.checkbox("Extração assíncrona (asyncio)", value=False)
+        adaptive = st.checkbox("Concorrência adaptativa (AIMD)", value=True)
+        incremental = st.checkbox("Extração incremental (apenas meses novos)", value=False)
+        retry_dead = st.checkbox(
+            "Reprocessar dead letter", value=False, disabled=use_async,
+            help="Devolve à fila as páginas que falharam nas execuções anteriores (extração com fila)."
+        )
         if st.button("Executar Extração"):
             status_area = st.empty()
 
@@ -222,37 +333,52 @@ if menu == "🧩 ETL - Despesas dos Deputados":
                 status_area.text(text)  
 
             with st.spinner("⏳ Executando extração... Isso pode levar alguns minutos."):
-                deputado_despesas_extraction.extraction_despesas_parallel(
-                    directory=RAW_DATA,
-                    max_workers=10,  
-                    st_callback=update_progress
-                )
-
-            st.success("✅ Dados extraídos com sucesso!")
+                published = True
+                if use_async:
+                    deputado_despesas_extraction.extraction_despesas_async(
+                        directory=RAW_DATA,
+                        st_callback=update_progress,
+                        adaptive=adaptive,
+                        incremental=incremental
+                    )
+                else:
+                    published = deputado_despesas_extraction.extraction_despesas_parallel(
+                        directory=RAW_DATA,
+                        max_workers=10,  
+                        st_callback=update_progress,
+                        adaptive=adaptive,
+                        incremental=incremental,
+                        retry_dead=retry_dead
+                    )
+
+            if published:
+                st.success("✅ Dados extraídos com sucesso!")
+            else:
+                st.warning("⚠️ Há páginas na dead letter; o CSV não foi publicado. "
+                           "Marque \"Reprocessar dead letter\" e execute novamente.")
 
         # Visualização de arquivos gerados
         st.markdown("---")
 
-        if os.path.exists(csv_path_dep_despesas):
-            st.markdown("**📄 CSV - Deputados**")
-            df = pd.read_csv(csv_path_dep_despesas)
-            st.dataframe(df.head(20))
-        else:
-            st.warning("CSV não encontrado. Execute a etapa de extração.")
+        show_table_preview(csv_path_dep_despesas, "Despesas dos Deputados")
 
     # Aba de Transformação
     with tab2:
         st.header("🔁 Transformação")
         if st.button("Executar Transformação"):
-            #deputado_transformation.main()
+            with st.spinner("⏳ Executando transformação em paralelo..."):
+                deputado_despesas_transformation.main()
             st.success("✅ Transformação e exportação concluídas!")
 
         # Visualização de arquivos gerados
         st.markdown("---")
 
-        if os.path.exists(nt_path_dep_despesas):
-            st.markdown("**🧠 RDF (formato .nt)**")
-            with open(nt_path_dep_despesas, "r", encoding="utf-8") as f:
+        manifest = deputado_despesas_transformation.load_manifest()
+        if manifest and manifest["shards"]:
+            st.markdown(f"**🧠 RDF (formato .nt)** — {manifest['triplas']} triplas em {len(manifest['shards'])} shards")
+            st.dataframe(pd.DataFrame(manifest["shards"]))
+            shard_path = os.path.join(PROCESSED_DATA, manifest["shards"][0]["path"])
+            with open_nt_input(shard_path) as f:
                 nt_preview = f.read(2000)
                 st.code(nt_preview, language="turtle")
         else:
@@ -263,8 +389,12 @@ if menu == "🧩 ETL - Despesas dos Deputados":
     with tab3:
         st.header("🔁 Carga")
         if st.button("Executar Carga"):
-            #deputado_loading.main()
-            st.success("✅ Carga concluída!")
+            stats = deputado_despesas_loading.loading_despesas()
+            if stats:
+                st.success(f"✅ Carga concluída! {stats['inseridas']} triplas inseridas e "
+                           f"{stats['removidas']} removidas em {stats['segundos']:.1f}s")
+            else:
+                st.warning("Manifesto das despesas não encontrado. Execute a etapa de transformação.")
 
         # Exibir imagem após a carga
         st.markdown("---")
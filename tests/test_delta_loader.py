@@ -0,0 +1,49 @@
+from graph.core.data.neo4j.bulk_loader import group_deletions, group_triples
+from graph.core.data.neo4j.delta_loader import _iter_triples, _split_delta, _write_restores
+
+
+DEPUTADO = "<https://dadosabertos.camara.leg.br/recurso/deputado/1>"
+NAME = "<http://xmlns.com/foaf/0.1/name>"
+PARTY = "<http://schema.org/memberOf>"
+
+
+def _write_snapshot(path, lines):
+    path.write_text("".join(sorted(line + " .\n" for line in lines)), encoding="utf-8")
+    return str(path)
+
+
+def test_removed_literal_keeps_remaining_value(tmp_path):
+    old = _write_snapshot(tmp_path / "old.nt", [
+        f'{DEPUTADO} {NAME} "Fulano de Tal"',
+        f'{DEPUTADO} {NAME} "Fulano"',
+        f'{DEPUTADO} {PARTY} <https://dadosabertos.camara.leg.br/recurso/partido/A>',
+    ])
+    new = _write_snapshot(tmp_path / "new.nt", [
+        f'{DEPUTADO} {NAME} "Fulano"',
+        f'{DEPUTADO} {PARTY} <https://dadosabertos.camara.leg.br/recurso/partido/A>',
+    ])
+    tmp = str(tmp_path / "delta")
+
+    inserts, deletes, removed = _split_delta(old, new, tmp)
+    assert (inserts, deletes) == (0, 1)
+    assert _write_restores(new, removed, tmp + ".set") == 1
+
+    # A remoção apaga a propriedade inteira; a regravação devolve o valor que continua no snapshot
+    _, props, _, _ = group_deletions(_iter_triples(tmp + ".del"))
+    assert props == {"name": [{"uri": DEPUTADO[1:-1]}]}
+    nodes, rels = group_triples(list(_iter_triples(tmp + ".set")))
+    assert nodes[()] == [{"uri": DEPUTADO[1:-1], "props": {"name": "Fulano"}}]
+    assert rels == {}
+
+
+def test_removed_relationship_needs_no_restore(tmp_path):
+    old = _write_snapshot(tmp_path / "old.nt", [
+        f'{DEPUTADO} {PARTY} <https://dadosabertos.camara.leg.br/recurso/partido/A>',
+        f'{DEPUTADO} {NAME} "Fulano"',
+    ])
+    new = _write_snapshot(tmp_path / "new.nt", [f'{DEPUTADO} {NAME} "Fulano"'])
+    tmp = str(tmp_path / "delta")
+
+    _, deletes, removed = _split_delta(old, new, tmp)
+    assert deletes == 1 and removed == set()
+    assert _write_restores(new, removed, tmp + ".set") == 0